@@ -7,6 +7,7 @@ Supports: HTML, Markdown, LaTeX, PDF, PowerPoint, and Quarto Markdown files.
 
 import io
 import os
+import re
 import sys
 import zipfile
 from pathlib import Path
@@ -28,7 +29,7 @@ from processors import (
     PowerPointProcessor,
 )
 from utils.claude_client import ClaudeClient
-from utils.accessibility import AccessibilityReport
+from utils.accessibility import AccessibilityReport, Severity
 
 # Load environment variables
 load_dotenv()
@@ -55,6 +56,15 @@ FILE_PROCESSORS = {
 
 ALLOWED_EXTENSIONS = list(FILE_PROCESSORS.keys())
 
+# Markdown metacharacters (and $, which Streamlit renders as math) in report text
+_MARKDOWN_SPECIAL_RE = re.compile(r'([\\`*_{}\[\]<>()#+!|~$])')
+
+
+@st.cache_resource(show_spinner=False)
+def get_claude_client() -> ClaudeClient:
+    """Create the Claude client once so reruns and uploads share its connection pool."""
+    return ClaudeClient()
+
 
 def get_processor_for_file(filename: str, claude_client: ClaudeClient):
     """Get the appropriate processor for a file based on extension."""
@@ -127,6 +137,11 @@ def create_zip(files: list[tuple[str, bytes]]) -> bytes:
     return zip_buffer.getvalue()
 
 
+def _markdown_text(text: str) -> str:
+    """Escape report text so it renders literally on one line of a Markdown list."""
+    return _MARKDOWN_SPECIAL_RE.sub(r'\\\1', ' '.join(text.split()))
+
+
 def display_report(report: AccessibilityReport, filename: str):
     """Display an accessibility report in Streamlit."""
     with st.expander(f"📋 Accessibility Report: {filename}", expanded=False):
@@ -136,28 +151,37 @@ def display_report(report: AccessibilityReport, filename: str):
         # Fixes applied
         if report.fixes_applied:
             st.markdown("### ✅ Fixes Applied")
-            for fix in report.fixes_applied:
-                st.markdown(f"- {fix}")
-
-        # Remaining issues
-        errors = [i for i in report.issues if i.severity.value == "error" and not i.auto_fixed]
-        warnings = [i for i in report.issues if i.severity.value == "warning" and not i.auto_fixed]
+            # Each section's items go out as one Markdown list rather than an element per line,
+            # so item text is escaped to keep it from affecting the items after it
+            st.markdown("\n".join(f"- {_markdown_text(fix)}" for fix in report.fixes_applied))
+
+        # Remaining issues, split by severity in one pass
+        remaining = {Severity.ERROR: [], Severity.WARNING: [], Severity.INFO: []}
+        for issue in report.issues:
+            if not issue.auto_fixed:
+                remaining[issue.severity].append(issue)
+        errors = remaining[Severity.ERROR]
+        warnings = remaining[Severity.WARNING]
 
         if errors:
             st.markdown("### ❌ Errors (Require Attention)")
+            lines = []
             for issue in errors:
-                st.markdown(f"- **[{issue.wcag_criterion}]** {issue.description}")
+                lines.append(f"- **[{issue.wcag_criterion}]** {_markdown_text(issue.description)}")
                 if issue.location:
-                    st.markdown(f"  - Location: {issue.location}")
+                    lines.append(f"  - Location: {_markdown_text(issue.location)}")
                 if issue.suggestion:
-                    st.markdown(f"  - Suggestion: {issue.suggestion}")
+                    lines.append(f"  - Suggestion: {_markdown_text(issue.suggestion)}")
+            st.markdown("\n".join(lines))
 
         if warnings:
             st.markdown("### ⚠️ Warnings")
+            lines = []
             for issue in warnings:
-                st.markdown(f"- **[{issue.wcag_criterion}]** {issue.description}")
+                lines.append(f"- **[{issue.wcag_criterion}]** {_markdown_text(issue.description)}")
                 if issue.suggestion:
-                    st.markdown(f"  - Suggestion: {issue.suggestion}")
+                    lines.append(f"  - Suggestion: {_markdown_text(issue.suggestion)}")
+            st.markdown("\n".join(lines))
 
         # General warnings
         if report.warnings:
@@ -206,7 +230,7 @@ def main():
 
     # Initialize Claude client
     try:
-        claude_client = ClaudeClient()
+        claude_client = get_claude_client()
     except Exception as e:
         st.error(f"Failed to initialize Claude client: {str(e)}")
         st.stop()
@@ -1,10 +1,13 @@
 """Base processor class for accessibility conversion."""
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Optional, TextIO
 from utils.accessibility import AccessibilityReport
 from utils.claude_client import ClaudeClient
 
+# Upper bound on concurrent Claude requests made while processing one document
+MAX_CLAUDE_WORKERS = 8
+
 
 class BaseProcessor(ABC):
     """Abstract base class for document processors."""
@@ -20,13 +23,15 @@ class BaseProcessor(ABC):
         self.report = AccessibilityReport()
 
     @abstractmethod
-    def process(self, content: bytes, filename: str = "") -> bytes:
+    def process(self, content: bytes, filename: str = "", report_stream: Optional[TextIO] = None) -> bytes:
         """
         Process a document for accessibility.
 
         Args:
             content: Raw file content as bytes
             filename: Original filename for context
+            report_stream: Optional writable text file; issues are streamed
+                to it as JSON lines instead of held in the report
 
         Returns:
             Processed file content as bytes
@@ -42,9 +47,10 @@ class BaseProcessor(ABC):
         """Get the accessibility report for the processed document."""
         return self.report
 
-    def reset_report(self):
-        """Reset the report for a new document."""
+    def reset_report(self, report_stream: Optional[TextIO] = None):
+        """Reset the report for a new document, optionally streaming its issues to report_stream."""
         self.report = AccessibilityReport()
+        self.report.set_sink(report_stream)
 
     def _extract_text_context(self, content: str, position: int, window: int = 200) -> str:
         """
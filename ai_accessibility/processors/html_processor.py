@@ -1,9 +1,10 @@
 """HTML accessibility processor."""
 
 import re
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, TextIO
 from bs4 import BeautifulSoup, Tag
-from .base import BaseProcessor
+from .base import MAX_CLAUDE_WORKERS, BaseProcessor
 from utils.accessibility import AccessibilityChecker, AccessibilityIssue, Severity
 from utils.claude_client import ClaudeClient
 
@@ -23,18 +24,19 @@ class HTMLProcessor(BaseProcessor):
     def get_file_extension(self) -> str:
         return ".html"
 
-    def process(self, content: bytes, filename: str = "") -> bytes:
+    def process(self, content: bytes, filename: str = "", report_stream: Optional[TextIO] = None) -> bytes:
         """
         Process HTML for WCAG 2.1 AA accessibility.
 
         Args:
             content: HTML content as bytes
             filename: Original filename
+            report_stream: Optional file to stream issues to as JSON lines
 
         Returns:
             Accessible HTML as bytes
         """
-        self.reset_report()
+        self.reset_report(report_stream)
 
         # Parse HTML
         html_str = content.decode('utf-8', errors='replace')
@@ -118,6 +120,7 @@ class HTMLProcessor(BaseProcessor):
     def _add_image_alt_text(self, soup: BeautifulSoup):
         """Add alt text to images missing it."""
         images = soup.find_all('img')
+        images_to_describe = []
 
         for img in images:
             if not isinstance(img, Tag):
@@ -142,23 +145,36 @@ class HTMLProcessor(BaseProcessor):
                 if parent:
                     surrounding = parent.get_text(strip=True)[:200]
 
-                # Generate alt text with Claude
-                try:
-                    new_alt = self.claude_client.generate_alt_text(
-                        image_context=context,
-                        surrounding_text=surrounding
-                    )
-
-                    if new_alt == "DECORATIVE":
-                        img['alt'] = ""
-                        img['role'] = "presentation"
-                        self.report.add_fix(f"Marked image as decorative: {src[:50]}")
-                    else:
-                        img['alt'] = new_alt
-                        self.report.add_fix(f"Added alt text for image: {src[:50]}")
-                except Exception as e:
+                images_to_describe.append((img, src, context, surrounding))
+
+        if not images_to_describe:
+            return
+
+        # Generate alt text with Claude; the calls are network-bound, so threads overlap them
+        with ThreadPoolExecutor(max_workers=min(MAX_CLAUDE_WORKERS, len(images_to_describe))) as executor:
+            futures = [
+                executor.submit(
+                    self.claude_client.generate_alt_text,
+                    image_context=context,
+                    surrounding_text=surrounding
+                )
+                for _, _, context, surrounding in images_to_describe
+            ]
+
+        for (img, src, _, _), future in zip(images_to_describe, futures):
+            try:
+                new_alt = future.result()
+
+                if new_alt == "DECORATIVE":
                     img['alt'] = ""
-                    self.report.add_warning(f"Could not generate alt text for {src[:50]}: {str(e)}")
+                    img['role'] = "presentation"
+                    self.report.add_fix(f"Marked image as decorative: {src[:50]}")
+                else:
+                    img['alt'] = new_alt
+                    self.report.add_fix(f"Added alt text for image: {src[:50]}")
+            except Exception as e:
+                img['alt'] = ""
+                self.report.add_warning(f"Could not generate alt text for {src[:50]}: {str(e)}")
 
     def _is_unhelpful_alt(self, alt: str) -> bool:
         """Check if alt text is unhelpful."""
@@ -1,7 +1,7 @@
 """LaTeX accessibility processor."""
 
 import re
-from typing import Optional
+from typing import Optional, TextIO
 from .base import BaseProcessor
 from utils.accessibility import AccessibilityIssue, Severity
 from utils.claude_client import ClaudeClient
@@ -22,18 +22,19 @@ class LaTeXProcessor(BaseProcessor):
     def get_file_extension(self) -> str:
         return ".tex"
 
-    def process(self, content: bytes, filename: str = "") -> bytes:
+    def process(self, content: bytes, filename: str = "", report_stream: Optional[TextIO] = None) -> bytes:
         """
         Process LaTeX for accessibility.
 
         Args:
             content: LaTeX content as bytes
             filename: Original filename
+            report_stream: Optional file to stream issues to as JSON lines
 
         Returns:
             Accessible LaTeX as bytes
         """
-        self.reset_report()
+        self.reset_report(report_stream)
 
         tex_str = content.decode('utf-8', errors='replace')
 
@@ -315,7 +316,7 @@ class LaTeXProcessor(BaseProcessor):
         """Generate table caption using Claude."""
         try:
             response = self.claude_client.client.messages.create(
-                model=self.claude_client.model,
+                model=self.claude_client.fast_model,
                 max_tokens=100,
                 system="Generate a brief, descriptive table caption (1 sentence). Return ONLY the caption text.",
                 messages=[{
@@ -1,11 +1,69 @@
 """Markdown accessibility processor."""
 
 import re
-from typing import Optional
-from .base import BaseProcessor
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, TextIO
+from .base import MAX_CLAUDE_WORKERS, BaseProcessor
 from utils.accessibility import AccessibilityChecker, AccessibilityIssue, Severity
 from utils.claude_client import ClaudeClient
 
+# ATX headings and fenced code openers without a language
+_HEADING_RE = re.compile(r'^(#{1,6})\s+(.+)$')
+_H1_RE = re.compile(r'^#\s+')
+_BARE_FENCE_RE = re.compile(r'^```\s*$')
+
+# Images: ![alt](src) or ![alt](src "title"); links: [text](url) or [text](url "title")
+_IMG_RE = re.compile(r'!\[([^\]]*)\]\(([^)\s]+)(?:\s+"[^"]*")?\)')
+_LINK_RE = re.compile(r'\[([^\]]+)\]\(([^)\s]+)(?:\s+"([^"]*)")?\)')
+
+# Table rows and header separator rows (| --- | :---: |)
+_TABLE_ROW_RE = re.compile(r'^\|([^|]+\|)+\s*$')
+_TABLE_SEPARATOR_RE = re.compile(r'^\|(\s*:?-+:?\s*\|)+\s*$')
+
+# Colored <span> text, by inline style or by color-like class name
+_SPAN_COLOR_RE = re.compile(
+    r'<span\s+style=["\']color:\s*([^"\';\s]+)[;\s]*["\']>([^<]+)</span>', re.IGNORECASE
+)
+_CLASS_COLOR_RE = re.compile(
+    r'<span\s+class=["\']([^"\']*(?:red|green|blue|warning|error|success|danger)[^"\']*)["\']>([^<]+)</span>',
+    re.IGNORECASE
+)
+
+# Display ($$...$$) and inline ($...$) math
+_DISPLAY_MATH_RE = re.compile(r'\$\$([^$]+)\$\$', re.DOTALL)
+_INLINE_MATH_RE = re.compile(r'(?<!\$)\$([^$]+)\$(?!\$)')
+
+# Page, position, and color-only references in prose
+_PAGE_REF_RE = re.compile(r'([Ss]ee|[Oo]n|[Rr]efer to)\s+page\s+(\d+)')
+_POSITION_REF_RE = re.compile(
+    r'(the|see|as shown)\s+(above|below|following|previous)\s+(figure|table|section|image|diagram)',
+    re.IGNORECASE
+)
+_COLOR_REF_RE = re.compile(
+    r'(the|see|marked in|shown in|highlighted in)\s+(red|green|blue|yellow|orange|purple|pink)\s+(text|items?|sections?|areas?)?',
+    re.IGNORECASE
+)
+
+# A line that is only **bold** or __bold__ text, often a stand-in heading
+_BOLD_LINE_RE = re.compile(r'(?:\*\*[^*]+\*\*|__[^_]+__)\s*$')
+
+# First-line hints for _guess_language, checked in order
+_LANGUAGE_PATTERNS = tuple(
+    (lang, tuple(re.compile(p, re.IGNORECASE) for p in lang_patterns))
+    for lang, lang_patterns in (
+        ('python', [r'^(import |from |def |class |if __name__|print\()', r'\.py']),
+        ('javascript', [r'^(const |let |var |function |import |export )', r'console\.log', r'=>']),
+        ('java', [r'^(public |private |protected |class |import java)', r'System\.out']),
+        ('html', [r'^<(!DOCTYPE|html|head|body|div|p |span|a |img )', r'</']),
+        ('css', [r'^\s*[.#]?[\w-]+\s*\{', r':\s*(#|rgb|px|em|rem)']),
+        ('sql', [r'^(SELECT|INSERT|UPDATE|DELETE|CREATE|ALTER|DROP)\s', r'FROM\s']),
+        ('bash', [r'^(#!/bin/|echo |cd |ls |mkdir |chmod |sudo )', r'\$\(']),
+        ('json', [r'^\s*[\[{]', r'"\w+":\s*']),
+        ('yaml', [r'^\w+:\s*$', r'^-\s+\w+']),
+        ('xml', [r'^<\?xml', r'<[\w:]+[^>]*>']),
+    )
+)
+
 
 class MarkdownProcessor(BaseProcessor):
     """Processor for Markdown documents."""
@@ -22,18 +80,19 @@ class MarkdownProcessor(BaseProcessor):
     def get_file_extension(self) -> str:
         return ".md"
 
-    def process(self, content: bytes, filename: str = "") -> bytes:
+    def process(self, content: bytes, filename: str = "", report_stream: Optional[TextIO] = None) -> bytes:
         """
         Process Markdown for WCAG 2.1 AA accessibility.
 
         Args:
             content: Markdown content as bytes
             filename: Original filename
+            report_stream: Optional file to stream issues to as JSON lines
 
         Returns:
             Accessible Markdown as bytes
         """
-        self.reset_report()
+        self.reset_report(report_stream)
 
         md_str = content.decode('utf-8', errors='replace')
 
@@ -53,12 +112,11 @@ class MarkdownProcessor(BaseProcessor):
     def _fix_heading_hierarchy(self, content: str) -> str:
         """Fix heading hierarchy in Markdown."""
         # Find all headings (both # style and underline style)
-        heading_pattern = r'^(#{1,6})\s+(.+)$'
         headings = []
         lines = content.split('\n')
 
         for i, line in enumerate(lines):
-            match = re.match(heading_pattern, line)
+            match = _HEADING_RE.match(line)
             if match:
                 level = len(match.group(1))
                 text = match.group(2).strip()
@@ -77,6 +135,7 @@ class MarkdownProcessor(BaseProcessor):
         fixes = AccessibilityChecker.fix_heading_hierarchy(heading_data)
 
         # Apply fixes in reverse order (to preserve line numbers)
+        changed = False
         for i in range(len(fixes) - 1, -1, -1):
             orig_level, text, suggested = fixes[i]
             line_num = headings[i][0]
@@ -84,17 +143,28 @@ class MarkdownProcessor(BaseProcessor):
             if orig_level != suggested:
                 new_heading = '#' * suggested + ' ' + text
                 lines[line_num] = new_heading
+                changed = True
                 self.report.add_fix(
                     f"Changed h{orig_level} to h{suggested}: '{text[:30]}...'"
                     if len(text) > 30 else f"Changed h{orig_level} to h{suggested}: '{text}'"
                 )
 
+        # Hand back the original string when nothing moved so callers can detect it
+        if not changed:
+            return content
+
         return '\n'.join(lines)
 
     def _add_image_alt_text(self, content: str) -> str:
         """Add alt text to images missing it."""
-        # Pattern for images: ![alt](src) or ![alt](src "title")
-        img_pattern = r'!\[([^\]]*)\]\(([^)\s]+)(?:\s+"[^"]*")?\)'
+        if '![' not in content:
+            return content
+
+        # Request alt text for every image missing it up front so the calls overlap
+        missing_alt_srcs = list(dict.fromkeys(
+            match.group(2) for match in _IMG_RE.finditer(content) if not match.group(1).strip()
+        ))
+        generated_alts = self._generate_alt_texts(missing_alt_srcs)
 
         def replace_image(match):
             alt = match.group(1)
@@ -112,9 +182,7 @@ class MarkdownProcessor(BaseProcessor):
 
                 # Generate alt text
                 try:
-                    new_alt = self.claude_client.generate_alt_text(
-                        image_context=f"Markdown image with source: {src}"
-                    )
+                    new_alt = generated_alts[src].result()
 
                     if new_alt == "DECORATIVE":
                         # Keep empty alt for decorative images
@@ -134,12 +202,27 @@ class MarkdownProcessor(BaseProcessor):
 
             return full_match
 
-        return re.sub(img_pattern, replace_image, content)
+        return _IMG_RE.sub(replace_image, content)
+
+    def _generate_alt_texts(self, srcs: List[str]) -> Dict[str, Future]:
+        """Generate alt text for each image source concurrently; returns completed futures by source."""
+        if not srcs:
+            return {}
+
+        # Claude calls are network-bound, so threads overlap their round-trips
+        with ThreadPoolExecutor(max_workers=min(MAX_CLAUDE_WORKERS, len(srcs))) as executor:
+            return {
+                src: executor.submit(
+                    self.claude_client.generate_alt_text,
+                    image_context=f"Markdown image with source: {src}"
+                )
+                for src in srcs
+            }
 
     def _fix_link_text(self, content: str) -> str:
         """Fix non-descriptive link text."""
-        # Pattern for links: [text](url) or [text](url "title")
-        link_pattern = r'\[([^\]]+)\]\(([^)\s]+)(?:\s+"([^"]*)")?\)'
+        if '](' not in content:
+            return content
 
         links_to_improve = []
 
@@ -175,7 +258,7 @@ class MarkdownProcessor(BaseProcessor):
             return match.group(0)
 
         # First pass: collect problematic links
-        re.sub(link_pattern, collect_links, content)
+        _LINK_RE.sub(collect_links, content)
 
         # Get improvements from Claude and actually fix the link text
         if links_to_improve:
@@ -206,14 +289,12 @@ class MarkdownProcessor(BaseProcessor):
 
     def _add_code_language(self, content: str) -> str:
         """Add language identifiers to code blocks."""
-        # Pattern for fenced code blocks without language
-        pattern = r'^```\s*$'
-
         lines = content.split('\n')
         modified = False
 
         for i, line in enumerate(lines):
-            if re.match(pattern, line):
+            # Fenced code block without a language
+            if _BARE_FENCE_RE.match(line):
                 # Look at the next line to guess the language
                 if i + 1 < len(lines):
                     next_line = lines[i + 1]
@@ -229,42 +310,29 @@ class MarkdownProcessor(BaseProcessor):
 
     def _guess_language(self, code_line: str) -> str:
         """Guess programming language from a code line."""
-        patterns = {
-            'python': [r'^(import |from |def |class |if __name__|print\()', r'\.py'],
-            'javascript': [r'^(const |let |var |function |import |export )', r'console\.log', r'=>'],
-            'java': [r'^(public |private |protected |class |import java)', r'System\.out'],
-            'html': [r'^<(!DOCTYPE|html|head|body|div|p |span|a |img )', r'</'],
-            'css': [r'^\s*[.#]?[\w-]+\s*\{', r':\s*(#|rgb|px|em|rem)'],
-            'sql': [r'^(SELECT|INSERT|UPDATE|DELETE|CREATE|ALTER|DROP)\s', r'FROM\s'],
-            'bash': [r'^(#!/bin/|echo |cd |ls |mkdir |chmod |sudo )', r'\$\('],
-            'json': [r'^\s*[\[{]', r'"\w+":\s*'],
-            'yaml': [r'^\w+:\s*$', r'^-\s+\w+'],
-            'xml': [r'^<\?xml', r'<[\w:]+[^>]*>'],
-        }
-
-        for lang, lang_patterns in patterns.items():
+        for lang, lang_patterns in _LANGUAGE_PATTERNS:
             for p in lang_patterns:
-                if re.search(p, code_line, re.IGNORECASE):
+                if p.search(code_line):
                     return lang
 
         return 'text'
 
     def _add_table_headers(self, content: str) -> str:
         """Ensure tables have proper header rows."""
+        if '|' not in content:
+            return content
+
         # Markdown tables should have header row followed by separator
         # | Header 1 | Header 2 |
         # |----------|----------|
         # | Data 1   | Data 2   |
 
-        # Pattern to find tables without proper headers
-        table_pattern = r'^\|([^|]+\|)+\s*$'
-
         lines = content.split('\n')
         in_table = False
         table_start = -1
 
         for i, line in enumerate(lines):
-            if re.match(table_pattern, line.strip()):
+            if _TABLE_ROW_RE.match(line.strip()):
                 if not in_table:
                     in_table = True
                     table_start = i
@@ -273,7 +341,7 @@ class MarkdownProcessor(BaseProcessor):
                 if i + 1 < len(lines):
                     next_line = lines[i + 1].strip()
                     # Separator line should look like |---|---|
-                    if not re.match(r'^\|(\s*:?-+:?\s*\|)+\s*$', next_line):
+                    if not _TABLE_SEPARATOR_RE.match(next_line):
                         # This might be a table without headers
                         self.report.add_issue(AccessibilityIssue(
                             wcag_criterion="1.3.1",
@@ -282,7 +350,7 @@ class MarkdownProcessor(BaseProcessor):
                             location=f"Line {i + 1}"
                         ))
             else:
-                if in_table and not re.match(r'^\|', line.strip()):
+                if in_table and not line.strip().startswith('|'):
                     in_table = False
                     table_start = -1
 
@@ -290,10 +358,12 @@ class MarkdownProcessor(BaseProcessor):
 
     def _fix_color_only_information(self, content: str) -> str:
         """Fix color-only information in Markdown by adding additional visual indicators."""
-        # Pattern for HTML-style colored text: <span style="color:...">text</span>
-        # Handle both "color:red" and "color: red;" formats
-        span_color_pattern = r'<span\s+style=["\']color:\s*([^"\';\s]+)[;\s]*["\']>([^<]+)</span>'
+        # Both patterns below match HTML <span> tags only
+        if '<' not in content:
+            return content
 
+        # HTML-style colored text: <span style="color:...">text</span>
+        # Handles both "color:red" and "color: red;" formats
         def fix_span_color(match):
             color = match.group(1)
             text = match.group(2)
@@ -307,11 +377,9 @@ class MarkdownProcessor(BaseProcessor):
             self.report.add_fix(f"Added bold to color-emphasized text: '{text[:30]}...'" if len(text) > 30 else f"Added bold to color-emphasized text: '{text}'")
             return new_text
 
-        content = re.sub(span_color_pattern, fix_span_color, content, flags=re.IGNORECASE)
-
-        # Pattern for inline HTML with class-based colors
-        class_color_pattern = r'<span\s+class=["\']([^"\']*(?:red|green|blue|warning|error|success|danger)[^"\']*)["\']>([^<]+)</span>'
+        content = _SPAN_COLOR_RE.sub(fix_span_color, content)
 
+        # Inline HTML with class-based colors
         def fix_class_color(match):
             classes = match.group(1)
             text = match.group(2)
@@ -325,14 +393,15 @@ class MarkdownProcessor(BaseProcessor):
             self.report.add_fix(f"Added bold to class-colored text: '{text[:30]}...'" if len(text) > 30 else f"Added bold to class-colored text: '{text}'")
             return new_text
 
-        return re.sub(class_color_pattern, fix_class_color, content, flags=re.IGNORECASE)
+        return _CLASS_COLOR_RE.sub(fix_class_color, content)
 
     def _add_math_descriptions(self, content: str) -> str:
         """Add descriptions for mathematical equations in Markdown."""
-        # Pattern for display math ($$...$$)
-        display_math_pattern = r'\$\$([^$]+)\$\$'
+        if '$' not in content:
+            return content
 
-        matches = list(re.finditer(display_math_pattern, content, re.DOTALL))
+        # Display math ($$...$$)
+        matches = list(_DISPLAY_MATH_RE.finditer(content))
 
         for match in reversed(matches):  # Reverse to preserve positions
             math_content = match.group(1).strip()
@@ -364,8 +433,7 @@ class MarkdownProcessor(BaseProcessor):
                     ))
 
         # Also check for inline math that's complex
-        inline_math_pattern = r'(?<!\$)\$([^$]+)\$(?!\$)'
-        inline_matches = list(re.finditer(inline_math_pattern, content))
+        inline_matches = list(_INLINE_MATH_RE.finditer(content))
 
         complex_inline_count = 0
         for match in inline_matches:
@@ -402,10 +470,8 @@ class MarkdownProcessor(BaseProcessor):
 
     def _fix_ambiguous_references(self, content: str) -> str:
         """Fix ambiguous page/visual-only references in Markdown."""
-        # Pattern for "see page X" or "on page X"
-        page_ref_pattern = r'([Ss]ee|[Oo]n|[Rr]efer to)\s+page\s+(\d+)'
-
-        matches = list(re.finditer(page_ref_pattern, content))
+        # "see page X" or "on page X" (the pattern is case-sensitive, so 'page' must appear)
+        matches = list(_PAGE_REF_RE.finditer(content)) if 'page' in content else []
 
         for match in matches:
             self.report.add_issue(AccessibilityIssue(
@@ -415,10 +481,8 @@ class MarkdownProcessor(BaseProcessor):
                 suggestion="Use descriptive links or section references instead of page numbers"
             ))
 
-        # Pattern for "above" or "below" references
-        position_ref_pattern = r'(the|see|as shown)\s+(above|below|following|previous)\s+(figure|table|section|image|diagram)'
-
-        for match in re.finditer(position_ref_pattern, content, re.IGNORECASE):
+        # "above" or "below" references
+        for match in _POSITION_REF_RE.finditer(content):
             self.report.add_issue(AccessibilityIssue(
                 wcag_criterion="1.3.1",
                 severity=Severity.INFO,
@@ -426,10 +490,8 @@ class MarkdownProcessor(BaseProcessor):
                 suggestion="Consider using explicit labels or links to referenced content"
             ))
 
-        # Pattern for color-only references
-        color_ref_pattern = r'(the|see|marked in|shown in|highlighted in)\s+(red|green|blue|yellow|orange|purple|pink)\s+(text|items?|sections?|areas?)?'
-
-        for match in re.finditer(color_ref_pattern, content, re.IGNORECASE):
+        # Color-only references
+        for match in _COLOR_REF_RE.finditer(content):
             self.report.add_issue(AccessibilityIssue(
                 wcag_criterion="1.4.1",
                 severity=Severity.ERROR,
@@ -449,7 +511,7 @@ class MarkdownProcessor(BaseProcessor):
         for i, line in enumerate(lines):
             stripped = line.strip()
             # Check for bold text at start of line that might be a heading
-            if re.match(r'^\*\*[^*]+\*\*\s*$', stripped) or re.match(r'^__[^_]+__\s*$', stripped):
+            if _BOLD_LINE_RE.match(stripped):
                 # This looks like it could be a heading (bold text alone on a line)
                 if i + 1 < len(lines) and lines[i + 1].strip() == '':
                     potential_heading_issues.append((i + 1, stripped))
@@ -463,7 +525,7 @@ class MarkdownProcessor(BaseProcessor):
             ))
 
         # Check for document title (# at the start)
-        has_h1 = any(re.match(r'^#\s+', line) for line in lines)
+        has_h1 = any(_H1_RE.match(line) for line in lines)
         if not has_h1:
             self.report.add_issue(AccessibilityIssue(
                 wcag_criterion="2.4.2",
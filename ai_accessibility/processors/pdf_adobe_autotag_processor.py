@@ -4,7 +4,7 @@ import io
 import logging
 import os
 import tempfile
-from typing import Optional
+from typing import Optional, TextIO
 from datetime import datetime
 
 from adobe.pdfservices.operation.auth.service_principal_credentials import ServicePrincipalCredentials
@@ -18,9 +18,10 @@ from adobe.pdfservices.operation.pdfjobs.params.autotag_pdf.autotag_pdf_params i
 from adobe.pdfservices.operation.pdfjobs.result.autotag_pdf_result import AutotagPDFResult
 
 from .base import BaseProcessor
-from .pdf_processor import PDFProcessor
+from .pdf_processor import IMAGE_MEDIA_TYPES, PDFProcessor, describe_images
 from utils.accessibility import AccessibilityIssue, Severity
 from utils.claude_client import ClaudeClient
+from utils.llm_cache import LLMCache
 
 
 logger = logging.getLogger(__name__)
@@ -59,8 +60,10 @@ class AdobeAutoTagPDFProcessor(BaseProcessor):
     especially for complex documents or specific accessibility requirements.
     """
 
-    def __init__(self, claude_client: Optional[ClaudeClient] = None):
+    def __init__(self, claude_client: Optional[ClaudeClient] = None, llm_cache: Optional[LLMCache] = None):
         super().__init__(claude_client)
+        # Also handed to the fallback PDFProcessor so both share stored image descriptions
+        self.llm_cache = llm_cache or LLMCache()
         self._check_credentials()
 
     def get_file_extension(self) -> str:
@@ -78,18 +81,19 @@ class AdobeAutoTagPDFProcessor(BaseProcessor):
                 "Get credentials at: https://developer.adobe.com/document-services/docs/overview/pdf-services-api/"
             )
 
-    def process(self, content: bytes, filename: str = "") -> bytes:
+    def process(self, content: bytes, filename: str = "", report_stream: Optional[TextIO] = None) -> bytes:
         """
         Process PDF using Adobe Auto-Tag API for accessibility.
 
         Args:
             content: PDF content as bytes
             filename: Original filename
+            report_stream: Optional file to stream issues to as JSON lines
 
         Returns:
             Tagged accessible PDF as bytes
         """
-        self.reset_report()
+        self.reset_report(report_stream)
 
         try:
             # Create credentials
@@ -235,7 +239,7 @@ class AdobeAutoTagPDFProcessor(BaseProcessor):
             "Full PDF/UA structural tagging was not applied."
         )
         try:
-            fallback = PDFProcessor(self.claude_client)
+            fallback = PDFProcessor(self.claude_client, self.llm_cache)
             result = fallback.process(content, filename)
             # Merge fallback report into this report
             fb_report = fallback.get_report()
@@ -286,57 +290,75 @@ class AdobeAutoTagPDFProcessor(BaseProcessor):
             doc = fitz.open(stream=pdf_bytes, filetype="pdf")
             images_processed = 0
 
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                image_list = page.get_images(full=True)
-
-                for img_info in image_list:
-                    xref = img_info[0]
-
-                    try:
-                        # Extract image
-                        base_image = doc.extract_image(xref)
-                        image_bytes = base_image["image"]
-                        image_ext = base_image["ext"]
-
-                        # Determine media type
-                        media_type_map = {
-                            'png': 'image/png',
-                            'jpg': 'image/jpeg',
-                            'jpeg': 'image/jpeg',
-                            'gif': 'image/gif',
-                            'bmp': 'image/bmp',
-                        }
-                        media_type = media_type_map.get(image_ext.lower(), 'image/png')
-
-                        # Get context
-                        page_text = page.get_text()[:500]
-
-                        # Generate alt text with Claude
-                        alt_result = self.claude_client.describe_complex_image(
-                            image_data=image_bytes,
-                            media_type=media_type,
-                            context=f"PDF page {page_num + 1}. Context: {page_text}"
+            # Every image occurrence, in page order; each distinct image is extracted once
+            occurrences = []
+            extract_errors = {}
+
+            def image_requests():
+                """Yield each distinct image with the text of the first page it is on."""
+                seen = set()
+                for page_num in range(len(doc)):
+                    page = doc[page_num]
+                    image_list = page.get_images(full=True)
+                    page_text = None
+
+                    for img_info in image_list:
+                        xref = img_info[0]
+                        occurrences.append((page_num, xref))
+                        if xref in seen:
+                            continue
+                        seen.add(xref)
+
+                        try:
+                            # Extract image
+                            base_image = doc.extract_image(xref)
+                            image_bytes = base_image["image"]
+                            image_ext = base_image["ext"]
+
+                            # Determine media type
+                            media_type = IMAGE_MEDIA_TYPES.get(image_ext, 'image/png')
+
+                            # Get context, extracted once per page
+                            if page_text is None:
+                                page_text = page.get_text()[:500]
+                        except Exception as e:
+                            extract_errors[xref] = e
+                            continue
+
+                        yield xref, (
+                            image_bytes,
+                            media_type,
+                            f"PDF page {page_num + 1}. Context: {page_text}",
                         )
 
-                        alt_text = alt_result.get('alt_text', '')
+            # Generate alt text with Claude, describing images as they are extracted
+            descriptions = describe_images(self.claude_client, self.llm_cache, image_requests())
 
-                        if alt_text:
-                            # Try to add alt text to image object
-                            doc.xref_set_key(xref, "Alt", f"({alt_text})")
-                            images_processed += 1
+            for page_num, xref in occurrences:
+                try:
+                    if xref in extract_errors:
+                        raise extract_errors[xref]
+                    alt_result = descriptions[xref].result()
 
-                    except Exception as e:
-                        logger.warning(f"Could not add alt text to image on page {page_num + 1}: {e}")
+                    alt_text = alt_result.get('alt_text', '')
+
+                    if alt_text:
+                        # Try to add alt text to image object
+                        doc.xref_set_key(xref, "Alt", f"({alt_text})")
+                        images_processed += 1
+
+                except Exception as e:
+                    logger.warning(f"Could not add alt text to image on page {page_num + 1}: {e}")
 
             if images_processed > 0:
                 self.report.add_fix(
                     f"Added AI-generated alt text to {images_processed} images using Claude"
                 )
 
-            # Save updated PDF
+            # Save updated PDF. Adobe's output is already compacted and only /Alt
+            # keys changed, so a full dedup/recompress pass buys nothing here.
             output = io.BytesIO()
-            doc.save(output, garbage=4, deflate=True)
+            doc.save(output, garbage=1)
             doc.close()
             return output.getvalue()
 
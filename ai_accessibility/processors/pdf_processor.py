@@ -1,11 +1,115 @@
 """PDF accessibility processor."""
 
+import hashlib
 import io
-from typing import Optional
+import json
+import re
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Optional, TextIO, Tuple
 import fitz  # PyMuPDF
-from .base import BaseProcessor
+from .base import MAX_CLAUDE_WORKERS, BaseProcessor
 from utils.accessibility import AccessibilityIssue, Severity
-from utils.claude_client import ClaudeClient
+from utils.claude_client import IMAGE_DESCRIPTION_UNAVAILABLE, ClaudeClient
+from utils.llm_cache import LLMCache
+
+
+# Media types of extracted image formats sent to Claude, keyed by PyMuPDF's (lowercase) ext
+IMAGE_MEDIA_TYPES = {
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'gif': 'image/gif',
+    'bmp': 'image/bmp',
+}
+
+# Text lines that look like headings, with the bookmark level they get
+_HEADING_PATTERNS = (
+    (re.compile(r'^[A-Z][A-Z\s]{5,}$'), 1),  # ALL CAPS headings (level 1)
+    (re.compile(r'^(?:Chapter|Section|Part)\s+\d+'), 1),  # Chapter/Section headings (level 1)
+    (re.compile(r'^\d+\.\s+[A-Z]'), 1),  # Numbered sections like "1. Introduction" (level 1)
+    (re.compile(r'^\d+\.\d+\s+[A-Z]'), 2),  # Sub-sections like "1.1 Background" (level 2)
+)
+
+# Color-only references, including "in red" without a following noun
+_COLOR_ONLY_RE = re.compile(
+    r'(the|see|marked in|shown in|highlighted in|in)\s+(red|green|blue|yellow|orange|purple|pink)\s*(text|items?|sections?|areas?|cells?)?',
+    re.IGNORECASE
+)
+
+# Page, position, and color-only references in page text
+_PAGE_REF_RE = re.compile(r'([Ss]ee|[Oo]n|[Rr]efer to)\s+page\s+(\d+)')
+_POSITION_REF_RE = re.compile(
+    r'(the|see|as shown)\s+(above|below|following|previous)\s+(figure|table|section|image|diagram|chart)',
+    re.IGNORECASE
+)
+_COLOR_REF_RE = re.compile(
+    r'(the|see|marked in|shown in|highlighted in)\s+(red|green|blue|yellow|orange|purple|pink)\s+(text|items?|sections?|areas?)?',
+    re.IGNORECASE
+)
+
+
+def _describe_image(
+    claude_client: ClaudeClient,
+    llm_cache: LLMCache,
+    image_bytes: bytes,
+    media_type: str,
+    context: str,
+) -> dict:
+    """describe_complex_image, reusing the stored result for an image seen before in the same context."""
+    # The context is part of the prompt and shapes the description, so it is part of the key
+    key = LLMCache.make_key(
+        model=claude_client.vision_model,
+        kind='complex-image',
+        image=hashlib.sha256(image_bytes).hexdigest(),
+        context=context,
+    )
+    cached = llm_cache.get(key)
+    if cached is not None:
+        return json.loads(cached)
+
+    result = claude_client.describe_complex_image(
+        image_data=image_bytes,
+        media_type=media_type,
+        context=context,
+    )
+    if result.get('alt_text') != IMAGE_DESCRIPTION_UNAVAILABLE:
+        llm_cache.set(key, json.dumps(result))
+    return result
+
+
+def describe_images(
+    claude_client: ClaudeClient,
+    llm_cache: LLMCache,
+    requests: Iterable[Tuple[int, Tuple[bytes, str, str]]],
+) -> Dict[int, Future]:
+    """
+    Describe several images concurrently with describe_complex_image.
+
+    Args:
+        claude_client: Client used for the requests
+        llm_cache: Cache of earlier descriptions, keyed by image content and context
+        requests: (xref, (image_bytes, media_type, context)) pairs, consumed lazily
+
+    Returns:
+        Completed futures keyed by image xref
+    """
+    descriptions = {}
+    in_flight = set()
+
+    # Claude calls are network-bound, so threads overlap their round-trips. Only a
+    # bounded number of requests is submitted ahead, so just those images' bytes
+    # are held in memory rather than every image in the document.
+    with ThreadPoolExecutor(max_workers=MAX_CLAUDE_WORKERS) as executor:
+        for xref, (image_bytes, media_type, context) in requests:
+            if len(in_flight) >= MAX_CLAUDE_WORKERS:
+                _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            future = executor.submit(
+                _describe_image, claude_client, llm_cache, image_bytes, media_type, context
+            )
+            descriptions[xref] = future
+            in_flight.add(future)
+
+    return descriptions
 
 
 class PDFProcessor(BaseProcessor):
@@ -27,24 +131,27 @@ class PDFProcessor(BaseProcessor):
         'read more', 'learn more', 'more', 'info', 'details'
     }
 
-    def __init__(self, claude_client: Optional[ClaudeClient] = None):
+    def __init__(self, claude_client: Optional[ClaudeClient] = None, llm_cache: Optional[LLMCache] = None):
         super().__init__(claude_client)
+        # Image descriptions are reused for images already seen in earlier documents
+        self.llm_cache = llm_cache or LLMCache()
 
     def get_file_extension(self) -> str:
         return ".pdf"
 
-    def process(self, content: bytes, filename: str = "") -> bytes:
+    def process(self, content: bytes, filename: str = "", report_stream: Optional[TextIO] = None) -> bytes:
         """
         Process PDF for accessibility.
 
         Args:
             content: PDF content as bytes
             filename: Original filename
+            report_stream: Optional file to stream issues to as JSON lines
 
         Returns:
             Accessible PDF as bytes
         """
-        self.reset_report()
+        self.reset_report(report_stream)
 
         # Open PDF
         doc = fitz.open(stream=content, filetype="pdf")
@@ -242,87 +349,104 @@ class PDFProcessor(BaseProcessor):
         images_with_alt = 0
         alt_text_annotations = []
 
-        for page_num in range(len(doc)):
-            page = doc[page_num]
+        # Every image occurrence, in page order; each distinct image is extracted once
+        occurrences = []
+        extract_errors = {}
 
-            # Get images on page
-            image_list = page.get_images(full=True)
+        def image_requests():
+            """Yield each distinct image with the text of the first page it is on."""
+            seen = set()
+            for page_num in range(len(doc)):
+                page = doc[page_num]
 
-            for img_index, img_info in enumerate(image_list):
-                xref = img_info[0]
+                # Get images on page
+                image_list = page.get_images(full=True)
+                page_text = None
 
-                try:
-                    # Extract image
-                    base_image = doc.extract_image(xref)
-                    image_bytes = base_image["image"]
-                    image_ext = base_image["ext"]
-
-                    # Determine media type
-                    media_type_map = {
-                        'png': 'image/png',
-                        'jpg': 'image/jpeg',
-                        'jpeg': 'image/jpeg',
-                        'gif': 'image/gif',
-                        'bmp': 'image/bmp',
-                    }
-                    media_type = media_type_map.get(image_ext.lower(), 'image/png')
-
-                    # Get surrounding text for context
-                    page_text = page.get_text()[:500]
-
-                    # Generate alt text
-                    try:
-                        alt_result = self.claude_client.describe_complex_image(
-                            image_data=image_bytes,
-                            media_type=media_type,
-                            context=f"PDF page {page_num + 1}. Surrounding text: {page_text}"
-                        )
+                for img_index, img_info in enumerate(image_list):
+                    xref = img_info[0]
+                    occurrences.append((page_num, img_index, xref))
+                    if xref in seen:
+                        continue
+                    seen.add(xref)
 
-                        alt_text = alt_result.get('alt_text', '')
-                        long_desc = alt_result.get('long_description', '')
-
-                        if alt_text:
-                            # Try to embed alt text in PDF structure
-                            try:
-                                # Get image xref and set /Alt tag
-                                img_obj = doc.xref_object(xref)
-                                # Add /Alt entry to image dictionary
-                                doc.xref_set_key(xref, "Alt", f"({alt_text})")
-                                images_with_alt += 1
-
-                                self.report.add_fix(
-                                    f"Embedded alt text for image on page {page_num + 1}: "
-                                    f"'{alt_text[:50]}...'"
-                                )
-                            except Exception as embed_err:
-                                # Fallback: store alt text for annotation
-                                alt_text_annotations.append({
-                                    'page': page_num,
-                                    'img_index': img_index,
-                                    'alt_text': alt_text,
-                                    'long_desc': long_desc
-                                })
-                                self.report.add_fix(
-                                    f"Generated alt text for image on page {page_num + 1}: "
-                                    f"'{alt_text[:50]}...'"
-                                )
-
-                            # If complex image, note long description
-                            if alt_result.get('is_complex') and long_desc:
-                                self.report.add_warning(
-                                    f"Complex image on page {page_num + 1} may need additional "
-                                    f"description. Long description: {long_desc[:100]}..."
-                                )
+                    try:
+                        # Extract image
+                        base_image = doc.extract_image(xref)
+                        image_bytes = base_image["image"]
+                        image_ext = base_image["ext"]
 
+                        # Determine media type
+                        media_type = IMAGE_MEDIA_TYPES.get(image_ext, 'image/png')
                     except Exception as e:
+                        extract_errors[xref] = e
+                        continue
+
+                    # Get surrounding text for context, extracted once per page
+                    if page_text is None:
+                        page_text = page.get_text()[:500]
+
+                    yield xref, (
+                        image_bytes,
+                        media_type,
+                        f"PDF page {page_num + 1}. Surrounding text: {page_text}",
+                    )
+
+        # Images are described concurrently as they are extracted
+        descriptions = describe_images(self.claude_client, self.llm_cache, image_requests())
+
+        for page_num, img_index, xref in occurrences:
+            if xref in extract_errors:
+                self.report.add_warning(
+                    f"Could not process image on page {page_num + 1}: {str(extract_errors[xref])}"
+                )
+                continue
+
+            try:
+                alt_result = descriptions[xref].result()
+
+                alt_text = alt_result.get('alt_text', '')
+                long_desc = alt_result.get('long_description', '')
+
+                if alt_text:
+                    # Try to embed alt text in PDF structure
+                    try:
+                        # Get image xref and set /Alt tag
+                        img_obj = doc.xref_object(xref)
+                        # Add /Alt entry to image dictionary
+                        doc.xref_set_key(xref, "Alt", f"({alt_text})")
+                        images_with_alt += 1
+
+                        self.report.add_fix(
+                            f"Embedded alt text for image on page {page_num + 1}: "
+                            f"'{alt_text[:50]}...'"
+                        )
+                    except Exception as embed_err:
+                        # Fallback: store alt text for annotation
+                        alt_text_annotations.append({
+                            'page': page_num,
+                            'img_index': img_index,
+                            'alt_text': alt_text,
+                            'long_desc': long_desc
+                        })
+                        self.report.add_fix(
+                            f"Generated alt text for image on page {page_num + 1}: "
+                            f"'{alt_text[:50]}...'"
+                        )
+
+                    # If complex image, note long description
+                    if alt_result.get('is_complex') and long_desc:
                         self.report.add_warning(
-                            f"Could not generate alt text for image on page {page_num + 1}: {str(e)}"
+                            f"Complex image on page {page_num + 1} may need additional "
+                            f"description. Long description: {long_desc[:100]}..."
                         )
 
-                    images_processed += 1
+            except Exception as e:
+                self.report.add_warning(
+                    f"Could not generate alt text for image on page {page_num + 1}: {str(e)}"
+                )
 
-                except Exception as e:
-                    self.report.add_warning(f"Could not process image on page {page_num + 1}: {str(e)}")
+            images_processed += 1
 
         if images_processed > 0:
             if images_with_alt == images_processed:
@@ -347,14 +471,6 @@ class PDFProcessor(BaseProcessor):
 
         # Try to detect headings and create bookmarks
         toc = []
-        heading_patterns = [
-            (r'^[A-Z][A-Z\s]{5,}$', 1),  # ALL CAPS headings (level 1)
-            (r'^(?:Chapter|Section|Part)\s+\d+', 1),  # Chapter/Section headings (level 1)
-            (r'^\d+\.\s+[A-Z]', 1),  # Numbered sections like "1. Introduction" (level 1)
-            (r'^\d+\.\d+\s+[A-Z]', 2),  # Sub-sections like "1.1 Background" (level 2)
-        ]
-
-        import re
 
         for page_num in range(len(doc)):
             page = doc[page_num]
@@ -375,8 +491,8 @@ class PDFProcessor(BaseProcessor):
                         # Check if this looks like a heading
                         if len(text) > 3 and len(text) < 100:
                             # Check patterns
-                            for pattern, level in heading_patterns:
-                                if re.match(pattern, text):
+                            for pattern, level in _HEADING_PATTERNS:
+                                if pattern.match(text):
                                     toc.append([level, text, page_num + 1])
                                     break
                             else:
@@ -498,16 +614,12 @@ class PDFProcessor(BaseProcessor):
 
     def _check_color_only_information(self, doc: fitz.Document):
         """Check for color-only information in PDF content."""
-        import re
-
         for page_num in range(len(doc)):
             page = doc[page_num]
             page_text = page.get_text()
 
             # Check for color-only references in text
-            color_ref_pattern = r'(the|see|marked in|shown in|highlighted in|in)\s+(red|green|blue|yellow|orange|purple|pink)\s*(text|items?|sections?|areas?|cells?)?'
-
-            for match in re.finditer(color_ref_pattern, page_text, re.IGNORECASE):
+            for match in _COLOR_ONLY_RE.finditer(page_text):
                 self.report.add_issue(AccessibilityIssue(
                     wcag_criterion="1.4.1",
                     severity=Severity.ERROR,
@@ -523,15 +635,12 @@ class PDFProcessor(BaseProcessor):
 
     def _check_ambiguous_references(self, doc: fitz.Document):
         """Check for ambiguous page/visual-only references in PDF."""
-        import re
-
         for page_num in range(len(doc)):
             page = doc[page_num]
             page_text = page.get_text()
 
             # Pattern for "see page X" or "on page X"
-            page_ref_pattern = r'([Ss]ee|[Oo]n|[Rr]efer to)\s+page\s+(\d+)'
-            for match in re.finditer(page_ref_pattern, page_text):
+            for match in _PAGE_REF_RE.finditer(page_text):
                 self.report.add_issue(AccessibilityIssue(
                     wcag_criterion="1.3.1",
                     severity=Severity.WARNING,
@@ -540,8 +649,7 @@ class PDFProcessor(BaseProcessor):
                 ))
 
             # Pattern for "above" or "below" references
-            position_ref_pattern = r'(the|see|as shown)\s+(above|below|following|previous)\s+(figure|table|section|image|diagram|chart)'
-            for match in re.finditer(position_ref_pattern, page_text, re.IGNORECASE):
+            for match in _POSITION_REF_RE.finditer(page_text):
                 self.report.add_issue(AccessibilityIssue(
                     wcag_criterion="1.3.1",
                     severity=Severity.INFO,
@@ -550,8 +658,7 @@ class PDFProcessor(BaseProcessor):
                 ))
 
             # Pattern for color-only references
-            color_ref_pattern = r'(the|see|marked in|shown in|highlighted in)\s+(red|green|blue|yellow|orange|purple|pink)\s+(text|items?|sections?|areas?)?'
-            for match in re.finditer(color_ref_pattern, page_text, re.IGNORECASE):
+            for match in _COLOR_REF_RE.finditer(page_text):
                 self.report.add_issue(AccessibilityIssue(
                     wcag_criterion="1.4.1",
                     severity=Severity.ERROR,
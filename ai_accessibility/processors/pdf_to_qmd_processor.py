@@ -7,11 +7,13 @@ import subprocess
 import tempfile
 import shutil
 from pathlib import Path
-from typing import Optional
+from typing import Optional, TextIO
 import fitz  # PyMuPDF
 from .base import BaseProcessor
+from .pdf_processor import IMAGE_MEDIA_TYPES, describe_images
 from utils.accessibility import AccessibilityIssue, Severity
 from utils.claude_client import ClaudeClient
+from utils.llm_cache import LLMCache
 
 
 class PDFToQMDProcessor(BaseProcessor):
@@ -27,8 +29,14 @@ class PDFToQMDProcessor(BaseProcessor):
     The intermediate QMD is also available via get_qmd_content().
     """
 
-    def __init__(self, claude_client: Optional[ClaudeClient] = None, render_to_pdf: bool = True):
+    def __init__(
+        self,
+        claude_client: Optional[ClaudeClient] = None,
+        render_to_pdf: bool = True,
+        llm_cache: Optional[LLMCache] = None,
+    ):
         super().__init__(claude_client)
+        self.llm_cache = llm_cache or LLMCache()
         self.images_dir = "images"
         self.render_to_pdf = render_to_pdf
         self.qmd_content = None  # Store QMD content for reference
@@ -40,18 +48,19 @@ class PDFToQMDProcessor(BaseProcessor):
         """Get the intermediate QMD content."""
         return self.qmd_content
 
-    def process(self, content: bytes, filename: str = "") -> bytes:
+    def process(self, content: bytes, filename: str = "", report_stream: Optional[TextIO] = None) -> bytes:
         """
         Convert PDF to Quarto Markdown, then optionally render to PDF.
 
         Args:
             content: PDF content as bytes
             filename: Original filename
+            report_stream: Optional file to stream issues to as JSON lines
 
         Returns:
             PDF bytes (if render_to_pdf=True) or QMD bytes (if render_to_pdf=False)
         """
-        self.reset_report()
+        self.reset_report(report_stream)
 
         # Open PDF
         doc = fitz.open(stream=content, filetype="pdf")
@@ -84,87 +93,105 @@ class PDFToQMDProcessor(BaseProcessor):
 
             self.report.add_fix("Created QMD frontmatter with accessibility options")
 
-            # Extract content page by page
+            # Extract content page by page; images are described as they are extracted
             image_counter = 0
+            pages = []
 
-            for page_num in range(len(doc)):
-                page = doc[page_num]
+            def image_requests():
+                """Collect each page's text and images, yielding each distinct image once."""
+                seen = set()
+                for page_num in range(len(doc)):
+                    page = doc[page_num]
+                    text_lines = []
+                    images = []
+                    page_text = None
 
-                # Extract text blocks with structure hints
-                blocks = page.get_text("dict")["blocks"]
+                    # Extract text blocks with structure hints
+                    blocks = page.get_text("dict")["blocks"]
 
-                for block in blocks:
-                    if block.get("type") == 0:  # Text block
-                        text_content = self._extract_text_from_block(block)
-                        if text_content:
-                            qmd_lines.append(text_content)
+                    for block in blocks:
+                        if block.get("type") == 0:  # Text block
+                            text_content = self._extract_text_from_block(block)
+                            if text_content:
+                                text_lines.append(text_content)
 
-                # Extract images
-                image_list = page.get_images(full=True)
+                    # Extract images
+                    image_list = page.get_images(full=True)
 
-                for img_index, img_info in enumerate(image_list):
-                    xref = img_info[0]
+                    for img_index, img_info in enumerate(image_list):
+                        xref = img_info[0]
 
-                    try:
-                        # Extract image
-                        base_image = doc.extract_image(xref)
-                        image_bytes = base_image["image"]
-                        image_ext = base_image["ext"]
-
-                        # Generate filename
-                        image_filename = f"{self.images_dir}/image_{page_num + 1}_{img_index + 1}.{image_ext}"
+                        try:
+                            # Extract image
+                            base_image = doc.extract_image(xref)
+                            image_bytes = base_image["image"]
+                            image_ext = base_image["ext"]
 
-                        # Get surrounding text for context
-                        page_text = page.get_text()[:500]
+                            # Generate filename
+                            image_filename = f"{self.images_dir}/image_{page_num + 1}_{img_index + 1}.{image_ext}"
 
-                        # Generate alt text using Claude
-                        try:
-                            media_type_map = {
-                                'png': 'image/png',
-                                'jpg': 'image/jpeg',
-                                'jpeg': 'image/jpeg',
-                                'gif': 'image/gif',
-                                'bmp': 'image/bmp',
-                            }
-                            media_type = media_type_map.get(image_ext.lower(), 'image/png')
-
-                            alt_result = self.claude_client.describe_complex_image(
-                                image_data=image_bytes,
-                                media_type=media_type,
-                                context=f"PDF page {page_num + 1}. Surrounding text: {page_text}"
+                            # Get surrounding text for context, extracted once per page
+                            if page_text is None:
+                                page_text = page.get_text()[:500]
+                        except Exception as e:
+                            images.append((xref, None, e))
+                            continue
+
+                        images.append((xref, image_filename, None))
+
+                        # An image repeated on later pages is described once, in its first context
+                        if xref not in seen:
+                            seen.add(xref)
+                            yield xref, (
+                                image_bytes,
+                                IMAGE_MEDIA_TYPES.get(image_ext, 'image/png'),
+                                f"PDF page {page_num + 1}. Surrounding text: {page_text}",
                             )
 
-                            alt_text = alt_result.get('alt_text', 'Image description')
-                            is_complex = alt_result.get('is_complex', False)
-                            long_desc = alt_result.get('long_description', '')
+                    pages.append((text_lines, images))
 
-                            # Add image to QMD with Quarto figure syntax
-                            qmd_lines.append("")
-                            if is_complex and long_desc:
-                                # Complex image with long description
-                                qmd_lines.append(f"![{long_desc[:100]}...]({image_filename}){{fig-alt=\"{alt_text}\"}}")
-                                qmd_lines.append("")
-                                qmd_lines.append(f"::: {{.callout-note collapse=\"true\" title=\"Detailed Description\"}}")
-                                qmd_lines.append(long_desc)
-                                qmd_lines.append(":::")
-                                self.report.add_fix(f"Added complex image with long description: {image_filename}")
-                            else:
-                                # Simple image
-                                qmd_lines.append(f"![]({image_filename}){{fig-alt=\"{alt_text}\"}}")
-                                self.report.add_fix(f"Added image with alt text: {image_filename}")
+            # Generate alt text for every image using Claude
+            descriptions = describe_images(self.claude_client, self.llm_cache, image_requests())
+
+            for page_num, (text_lines, images) in enumerate(pages):
+                qmd_lines.extend(text_lines)
 
+                for xref, image_filename, extract_error in images:
+                    if extract_error is not None:
+                        self.report.add_warning(f"Could not extract image from page {page_num + 1}: {str(extract_error)}")
+                        continue
+
+                    try:
+                        alt_result = descriptions[xref].result()
+
+                        alt_text = alt_result.get('alt_text', 'Image description')
+                        is_complex = alt_result.get('is_complex', False)
+                        long_desc = alt_result.get('long_description', '')
+
+                        # Add image to QMD with Quarto figure syntax
+                        qmd_lines.append("")
+                        if is_complex and long_desc:
+                            # Complex image with long description
+                            qmd_lines.append(f"![{long_desc[:100]}...]({image_filename}){{fig-alt=\"{alt_text}\"}}")
                             qmd_lines.append("")
+                            qmd_lines.append(f"::: {{.callout-note collapse=\"true\" title=\"Detailed Description\"}}")
+                            qmd_lines.append(long_desc)
+                            qmd_lines.append(":::")
+                            self.report.add_fix(f"Added complex image with long description: {image_filename}")
+                        else:
+                            # Simple image
+                            qmd_lines.append(f"![]({image_filename}){{fig-alt=\"{alt_text}\"}}")
+                            self.report.add_fix(f"Added image with alt text: {image_filename}")
 
-                            # Store image data (would need to be saved separately in real implementation)
-                            image_counter += 1
+                        qmd_lines.append("")
 
-                        except Exception as e:
-                            # Fallback without alt text
-                            qmd_lines.append(f"![]({image_filename}){{fig-alt=\"Image from page {page_num + 1}\"}}")
-                            self.report.add_warning(f"Could not generate alt text for image: {str(e)}")
+                        # Store image data (would need to be saved separately in real implementation)
+                        image_counter += 1
 
                     except Exception as e:
-                        self.report.add_warning(f"Could not extract image from page {page_num + 1}: {str(e)}")
+                        # Fallback without alt text
+                        qmd_lines.append(f"![]({image_filename}){{fig-alt=\"Image from page {page_num + 1}\"}}")
+                        self.report.add_warning(f"Could not generate alt text for image: {str(e)}")
 
                 # Add page break comment
                 if page_num < len(doc) - 1:
@@ -352,8 +379,7 @@ class PDFToQMDProcessor(BaseProcessor):
 
             # Write QMD file
             qmd_file = Path(temp_dir) / "document.qmd"
-            with open(qmd_file, 'w', encoding='utf-8') as f:
-                f.write(qmd_content)
+            qmd_file.write_text(qmd_content, encoding='utf-8', newline='')
 
             # Render to PDF using Quarto
             # Use --to pdf for direct PDF output
@@ -374,10 +400,7 @@ class PDFToQMDProcessor(BaseProcessor):
             if not pdf_file.exists():
                 raise Exception("Quarto did not produce expected PDF output")
 
-            with open(pdf_file, 'rb') as f:
-                pdf_bytes = f.read()
-
-            return pdf_bytes
+            return pdf_file.read_bytes()
 
         finally:
             # Clean up temporary directory
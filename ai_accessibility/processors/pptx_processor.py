@@ -1,16 +1,72 @@
 """PowerPoint accessibility processor."""
 
 import io
-from typing import Optional
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional, TextIO
 from pptx import Presentation
 from pptx.util import Inches
 from pptx.enum.shapes import MSO_SHAPE_TYPE
 from pptx.oxml.ns import qn
-from .base import BaseProcessor
-from utils.accessibility import AccessibilityIssue, Severity
+from .base import MAX_CLAUDE_WORKERS, BaseProcessor
+from utils.accessibility import AccessibilityChecker, AccessibilityIssue, Severity
 from utils.claude_client import ClaudeClient
 
 
+# Clark-notation tag names, resolved once instead of per shape
+_QN_NVSP_PR = qn('p:nvSpPr')
+_QN_NVPIC_PR = qn('p:nvPicPr')
+_QN_CNV_PR = qn('p:cNvPr')
+_QN_TBL = qn('a:tbl')
+_QN_TBL_PR = qn('a:tblPr')
+_QN_HLINK_CLICK = qn('a:hlinkClick')
+_QN_RPR = qn('a:rPr')
+_QN_R_ID = qn('r:id')
+_QN_SOLID_FILL = qn('a:solidFill')
+
+# Shapes above this offset from the top of the slide can serve as its title
+_TITLE_TOP_LIMIT = Inches(1.5)
+
+
+# Color-only references in slide text, e.g. "the items in red"
+_COLOR_REFERENCE_RE = re.compile(
+    r'(the|see|marked in|shown in|highlighted in|in)\s+(red|green|blue|yellow|orange|purple|pink)\s*(text|items?|sections?|areas?|cells?)?',
+    re.IGNORECASE
+)
+
+# Ambiguous reference checks, in report order:
+# (pattern, wcag_criterion, severity, description label, suggestion)
+_AMBIGUOUS_REFERENCE_CHECKS = (
+    # "see slide X" or "on slide X" (slide-specific)
+    (re.compile(r'([Ss]ee|[Oo]n|[Rr]efer to)\s+slide\s+(\d+)'),
+     "1.3.1", Severity.INFO, "Slide reference",
+     "Consider using slide titles for clearer navigation"),
+    # "see page X" or "on page X"
+    (re.compile(r'([Ss]ee|[Oo]n|[Rr]efer to)\s+page\s+(\d+)'),
+     "1.3.1", Severity.WARNING, "Ambiguous page reference",
+     "Use descriptive references instead of page numbers"),
+    # "above" or "below" references
+    (re.compile(r'(the|see|as shown)\s+(above|below|following|previous)\s+(figure|table|section|image|diagram|slide|chart)', re.IGNORECASE),
+     "1.3.1", Severity.INFO, "Position-based reference",
+     "Use explicit labels or names for referenced content"),
+    # "on the left/right" references
+    (re.compile(r'(on the|to the|at the)\s+(left|right|top|bottom|center|corner)', re.IGNORECASE),
+     "1.3.1", Severity.INFO, "Spatial reference",
+     "Provide context that doesn't rely on visual position"),
+)
+
+
+class _PictureAltRequest(NamedTuple):
+    """A picture missing alt text, with the inputs for generating it."""
+    slide_num: int
+    shape: object
+    slide_text: str
+    image_bytes: Optional[bytes] = None
+    content_type: Optional[str] = None
+    # Set instead of image_bytes when the image could not be extracted
+    error: Optional[Exception] = None
+
+
 class PowerPointProcessor(BaseProcessor):
     """Processor for PowerPoint documents."""
 
@@ -26,18 +82,20 @@ class PowerPointProcessor(BaseProcessor):
     def get_file_extension(self) -> str:
         return ".pptx"
 
-    def process(self, content: bytes, filename: str = "") -> bytes:
+    def process(self, content: bytes, filename: str = "", report_stream: Optional[TextIO] = None) -> bytes:
         """
         Process PowerPoint for WCAG 2.1 AA accessibility.
 
         Args:
             content: PPTX content as bytes
             filename: Original filename
+            report_stream: Optional writable text file; issues are streamed
+                to it as JSON lines instead of held in the report
 
         Returns:
             Accessible PPTX as bytes
         """
-        self.reset_report()
+        self.reset_report(report_stream)
 
         # Open presentation
         prs = Presentation(io.BytesIO(content))
@@ -77,7 +135,7 @@ class PowerPointProcessor(BaseProcessor):
                         text = shape.text_frame.text.strip()
                         # Check if it looks like a title (short, at top of slide)
                         if text and len(text) < 100:
-                            if hasattr(shape, 'top') and shape.top < Inches(1.5):
+                            if hasattr(shape, 'top') and shape.top < _TITLE_TOP_LIMIT:
                                 title_text = text
                                 has_title = True
                                 break
@@ -103,6 +161,8 @@ class PowerPointProcessor(BaseProcessor):
 
     def _add_alt_text_to_images(self, prs: Presentation):
         """Add alt text to images and shapes."""
+        pictures = []
+
         for slide_num, slide in enumerate(prs.slides, 1):
             slide_text = self._get_slide_text(slide)[:300]
 
@@ -119,29 +179,15 @@ class PowerPointProcessor(BaseProcessor):
                             location=f"Shape: {shape.name}"
                         ))
 
-                        # Generate alt text
                         try:
                             # Extract image data
                             image = shape.image
-                            image_bytes = image.blob
-                            content_type = image.content_type
-
-                            # Generate description
-                            new_alt = self.claude_client.generate_alt_text(
-                                image_data=image_bytes,
-                                media_type=content_type,
-                                surrounding_text=slide_text
-                            )
-
-                            if new_alt == "DECORATIVE":
-                                self._set_alt_text(shape, "", decorative=True)
-                                self.report.add_fix(f"Marked image as decorative on slide {slide_num}")
-                            else:
-                                self._set_alt_text(shape, new_alt)
-                                self.report.add_fix(f"Added alt text to image on slide {slide_num}")
-
+                            pictures.append(_PictureAltRequest(
+                                slide_num, shape, slide_text,
+                                image_bytes=image.blob, content_type=image.content_type
+                            ))
                         except Exception as e:
-                            self.report.add_warning(f"Could not generate alt text for slide {slide_num}: {str(e)}")
+                            pictures.append(_PictureAltRequest(slide_num, shape, slide_text, error=e))
 
                 # Check other shape types that might need descriptions
                 elif shape.shape_type in [MSO_SHAPE_TYPE.CHART, MSO_SHAPE_TYPE.DIAGRAM,
@@ -156,20 +202,51 @@ class PowerPointProcessor(BaseProcessor):
                             location=f"Shape type: {shape.shape_type}, Name: {shape.name}"
                         ))
 
+        if not pictures:
+            return
+
+        # Generate descriptions for every picture at once; the calls are network-bound
+        with ThreadPoolExecutor(max_workers=min(MAX_CLAUDE_WORKERS, len(pictures))) as executor:
+            futures = [
+                executor.submit(
+                    self.claude_client.generate_alt_text,
+                    image_data=picture.image_bytes,
+                    media_type=picture.content_type,
+                    surrounding_text=picture.slide_text
+                ) if picture.error is None else None
+                for picture in pictures
+            ]
+
+        for picture, future in zip(pictures, futures):
+            try:
+                if picture.error is not None:
+                    raise picture.error
+                new_alt = future.result()
+
+                if new_alt == "DECORATIVE":
+                    self._set_alt_text_picture(picture.shape, "", decorative=True)
+                    self.report.add_fix(f"Marked image as decorative on slide {picture.slide_num}")
+                else:
+                    self._set_alt_text_picture(picture.shape, new_alt)
+                    self.report.add_fix(f"Added alt text to image on slide {picture.slide_num}")
+
+            except Exception as e:
+                self.report.add_warning(f"Could not generate alt text for slide {picture.slide_num}: {str(e)}")
+
     def _get_alt_text(self, shape) -> str:
         """Get alt text from a shape."""
         try:
             # Access the descr attribute from the shape's XML
-            nvSpPr = shape._element.find(qn('p:nvSpPr')) or shape._element.find(qn('p:nvPicPr'))
+            nvSpPr = shape._element.find(_QN_NVSP_PR) or shape._element.find(_QN_NVPIC_PR)
             if nvSpPr is not None:
-                cNvPr = nvSpPr.find(qn('p:cNvPr'))
+                cNvPr = nvSpPr.find(_QN_CNV_PR)
                 if cNvPr is not None:
                     return cNvPr.get('descr', '')
 
             # Alternative: check nvPicPr for pictures
-            nvPicPr = shape._element.find('.//' + qn('p:nvPicPr'))
+            nvPicPr = shape._element.find('.//' + _QN_NVPIC_PR)
             if nvPicPr is not None:
-                cNvPr = nvPicPr.find(qn('p:cNvPr'))
+                cNvPr = nvPicPr.find(_QN_CNV_PR)
                 if cNvPr is not None:
                     return cNvPr.get('descr', '')
 
@@ -178,25 +255,19 @@ class PowerPointProcessor(BaseProcessor):
 
         return ''
 
-    def _set_alt_text(self, shape, alt_text: str, decorative: bool = False):
-        """Set alt text for a shape."""
+    def _set_alt_text_picture(self, shape, alt_text: str, decorative: bool = False):
+        """Set alt text for a picture shape."""
         try:
-            # Find the cNvPr element
-            nvPicPr = shape._element.find('.//' + qn('p:nvPicPr'))
+            # Pictures keep cNvPr under their own nvPicPr child
+            nvPicPr = shape._element.find(_QN_NVPIC_PR)
             if nvPicPr is not None:
-                cNvPr = nvPicPr.find(qn('p:cNvPr'))
+                cNvPr = nvPicPr.find(_QN_CNV_PR)
                 if cNvPr is not None:
                     cNvPr.set('descr', alt_text)
                     if decorative:
                         # For decorative images, also set title to empty
                         cNvPr.set('title', '')
 
-            nvSpPr = shape._element.find('.//' + qn('p:nvSpPr'))
-            if nvSpPr is not None:
-                cNvPr = nvSpPr.find(qn('p:cNvPr'))
-                if cNvPr is not None:
-                    cNvPr.set('descr', alt_text)
-
         except Exception as e:
             self.report.add_warning(f"Could not set alt text: {str(e)}")
 
@@ -238,9 +309,9 @@ class PowerPointProcessor(BaseProcessor):
                     has_header = False
                     try:
                         # Check table properties
-                        tbl = shape._element.find('.//' + qn('a:tbl'))
+                        tbl = shape._element.find('.//' + _QN_TBL)
                         if tbl is not None:
-                            tblPr = tbl.find(qn('a:tblPr'))
+                            tblPr = tbl.find(_QN_TBL_PR)
                             if tblPr is not None:
                                 has_header = tblPr.get('firstRow') == '1'
                     except Exception:
@@ -295,16 +366,35 @@ class PowerPointProcessor(BaseProcessor):
     def _check_hyperlinks(self, prs: Presentation):
         """Check hyperlinks for accessibility."""
         for slide_num, slide in enumerate(prs.slides, 1):
+            link_targets = None
+
             for shape in slide.shapes:
                 if shape.has_text_frame:
+                    # Only walk the runs of shapes that contain a hyperlink
+                    if shape._element.find('.//' + _QN_HLINK_CLICK) is None:
+                        continue
                     for paragraph in shape.text_frame.paragraphs:
                         for run in paragraph.runs:
-                            if run.hyperlink and run.hyperlink.address:
+                            # Read the relationship id straight from the run XML
+                            rPr = run._r.find(_QN_RPR)
+                            if rPr is None:
+                                continue
+                            hlinkClick = rPr.find(_QN_HLINK_CLICK)
+                            if hlinkClick is None:
+                                continue
+                            rId = hlinkClick.get(_QN_R_ID)
+                            if not rId:
+                                continue
+
+                            # Resolve relationship targets once per slide
+                            if link_targets is None:
+                                link_targets = {rel.rId: rel.target_ref for rel in slide.part.rels.values()}
+
+                            href = link_targets.get(rId)
+                            if href:
                                 link_text = run.text
-                                href = run.hyperlink.address
 
                                 # Check for non-descriptive link text
-                                from utils.accessibility import AccessibilityChecker
                                 issue = AccessibilityChecker.check_link_text(link_text, href)
 
                                 if issue:
@@ -324,15 +414,11 @@ class PowerPointProcessor(BaseProcessor):
 
     def _check_color_only_information(self, prs: Presentation):
         """Check for color-only information in slides."""
-        import re
-
         for slide_num, slide in enumerate(prs.slides, 1):
             slide_text = self._get_slide_text(slide)
 
             # Check for color-only references in text
-            color_ref_pattern = r'(the|see|marked in|shown in|highlighted in|in)\s+(red|green|blue|yellow|orange|purple|pink)\s*(text|items?|sections?|areas?|cells?)?'
-
-            for match in re.finditer(color_ref_pattern, slide_text, re.IGNORECASE):
+            for match in _COLOR_REFERENCE_RE.finditer(slide_text):
                 self.report.add_issue(AccessibilityIssue(
                     wcag_criterion="1.4.1",
                     severity=Severity.ERROR,
@@ -343,6 +429,9 @@ class PowerPointProcessor(BaseProcessor):
             # Check shapes for color-only formatting
             for shape in slide.shapes:
                 if shape.has_text_frame:
+                    # Runs without a solid fill have no explicit RGB color
+                    if shape._element.find('.//' + _QN_SOLID_FILL) is None:
+                        continue
                     for paragraph in shape.text_frame.paragraphs:
                         for run in paragraph.runs:
                             # Check if run has color but no other distinguishing format
@@ -372,47 +461,14 @@ class PowerPointProcessor(BaseProcessor):
 
     def _check_ambiguous_references(self, prs: Presentation):
         """Check for ambiguous page/visual-only references in slides."""
-        import re
-
         for slide_num, slide in enumerate(prs.slides, 1):
             slide_text = self._get_slide_text(slide)
 
-            # Pattern for "see slide X" or "on slide X" (slide-specific)
-            slide_ref_pattern = r'([Ss]ee|[Oo]n|[Rr]efer to)\s+slide\s+(\d+)'
-            for match in re.finditer(slide_ref_pattern, slide_text):
-                self.report.add_issue(AccessibilityIssue(
-                    wcag_criterion="1.3.1",
-                    severity=Severity.INFO,
-                    description=f"Slide reference on slide {slide_num}: '{match.group(0)}'",
-                    suggestion="Consider using slide titles for clearer navigation"
-                ))
-
-            # Pattern for "see page X" or "on page X"
-            page_ref_pattern = r'([Ss]ee|[Oo]n|[Rr]efer to)\s+page\s+(\d+)'
-            for match in re.finditer(page_ref_pattern, slide_text):
-                self.report.add_issue(AccessibilityIssue(
-                    wcag_criterion="1.3.1",
-                    severity=Severity.WARNING,
-                    description=f"Ambiguous page reference on slide {slide_num}: '{match.group(0)}'",
-                    suggestion="Use descriptive references instead of page numbers"
-                ))
-
-            # Pattern for "above" or "below" references
-            position_ref_pattern = r'(the|see|as shown)\s+(above|below|following|previous)\s+(figure|table|section|image|diagram|slide|chart)'
-            for match in re.finditer(position_ref_pattern, slide_text, re.IGNORECASE):
-                self.report.add_issue(AccessibilityIssue(
-                    wcag_criterion="1.3.1",
-                    severity=Severity.INFO,
-                    description=f"Position-based reference on slide {slide_num}: '{match.group(0)}'",
-                    suggestion="Use explicit labels or names for referenced content"
-                ))
-
-            # Pattern for "on the left/right" references
-            spatial_ref_pattern = r'(on the|to the|at the)\s+(left|right|top|bottom|center|corner)'
-            for match in re.finditer(spatial_ref_pattern, slide_text, re.IGNORECASE):
-                self.report.add_issue(AccessibilityIssue(
-                    wcag_criterion="1.3.1",
-                    severity=Severity.INFO,
-                    description=f"Spatial reference on slide {slide_num}: '{match.group(0)}'",
-                    suggestion="Provide context that doesn't rely on visual position"
-                ))
+            for pattern, criterion, severity, label, suggestion in _AMBIGUOUS_REFERENCE_CHECKS:
+                for match in pattern.finditer(slide_text):
+                    self.report.add_issue(AccessibilityIssue(
+                        wcag_criterion=criterion,
+                        severity=severity,
+                        description=f"{label} on slide {slide_num}: '{match.group(0)}'",
+                        suggestion=suggestion
+                    ))
@@ -6,12 +6,17 @@ Integrates validation logic from quarto-wcag-compliance skill scripts:
 - fix_unicode.py - pdflatex Unicode compatibility
 """
 
+import hashlib
+import json
 import re
-import math
-from typing import Optional, Dict, List, Tuple
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import ClassVar, Optional, Dict, List, Tuple, TextIO
+from .base import MAX_CLAUDE_WORKERS
 from .markdown_processor import MarkdownProcessor
-from utils.accessibility import AccessibilityIssue, Severity
+from utils.accessibility import AccessibilityIssue, Severity, contrast_ratio
 from utils.claude_client import ClaudeClient
+from utils.llm_cache import LLMCache
 
 
 # Unicode to ASCII replacements for pdflatex compatibility
@@ -34,7 +39,7 @@ UNICODE_REPLACEMENTS: Dict[str, str] = {
     '⇒': '=>', '⇐': '<=', '⇔': '<=>',
     '↑': '^', '↓': 'v',
     # Smart quotes (common from Word/Google Docs)
-    '"': '"', '"': '"', ''': "'", ''': "'",
+    '\u201c': '"', '\u201d': '"', '\u2018': "'", '\u2019': "'",
     '«': '"', '»': '"',
     # Dashes
     '—': '--', '–': '-', '−': '-',
@@ -51,6 +56,156 @@ UNICODE_REPLACEMENTS: Dict[str, str] = {
     '°': ' degrees', '€': 'EUR', '£': 'GBP', '¥': 'JPY',
 }
 
+# Multi-codepoint replacement keys (emoji with a variation selector) go through
+# a regex; every single-codepoint key goes through one str.translate pass.
+_MULTI_CHAR_RE = re.compile('|'.join(
+    re.escape(k) for k in UNICODE_REPLACEMENTS if len(k) > 1
+))
+_SINGLE_CHAR_KEYS = frozenset(k for k in UNICODE_REPLACEMENTS if len(k) == 1)
+_UNICODE_TRANSLATION = {ord(k): UNICODE_REPLACEMENTS[k] for k in _SINGLE_CHAR_KEYS}
+
+# Characters reported as pdflatex hazards by _check_unicode_warnings
+_PROBLEMATIC_CHARS = {
+    '\u274c': 'cross mark',       # ❌
+    '\u2713': 'checkmark',        # ✓
+    '\u2714': 'checkmark',        # ✔
+    '\U0001F7E2': 'green circle', # 🟢
+    '\U0001F7E1': 'yellow circle',# 🟡
+    '\U0001F534': 'red circle',   # 🔴
+    '\u26a0': 'warning sign',     # ⚠
+    '\U0001F4A1': 'lightbulb',    # 💡
+    '\U0001F4DD': 'memo',         # 📝
+    '\u201c': 'left smart quote', # "
+    '\u201d': 'right smart quote',# "
+    '\u2018': 'left smart quote', # '
+    '\u2019': 'right smart quote',# '
+    '\u2014': 'em dash',          # —
+    '\u2013': 'en dash',          # –
+    '\u2026': 'ellipsis',         # …
+}
+_PROBLEMATIC_CHAR_SET = frozenset(_PROBLEMATIC_CHARS)
+
+# Color declarations in YAML/CSS checked for contrast: (pattern, color type).
+# Whitespace is [^\S\n] so a declaration never matches across lines.
+_COLOR_PATTERNS = [
+    (re.compile(r'color:[^\S\n]*["\']?(#[0-9A-Fa-f]{3,6})["\']?', re.IGNORECASE), 'text color'),
+    (re.compile(r'linkcolor:[^\S\n]*([a-zA-Z]+|#[0-9A-Fa-f]{3,6})', re.IGNORECASE), 'link color'),
+    (re.compile(r'urlcolor:[^\S\n]*([a-zA-Z]+|#[0-9A-Fa-f]{3,6})', re.IGNORECASE), 'URL color'),
+    (re.compile(r'background(?:-color)?:[^\S\n]*(#[0-9A-Fa-f]{3,6})', re.IGNORECASE), 'background'),
+]
+
+# Markdown links: [text](url), within a single line
+_LINK_RE = re.compile(r'\[([^\]\n]+)\]\(([^)\n]+)\)')
+
+# Link texts flagged as non-descriptive by _check_link_text_quality
+_BAD_LINK_TEXTS = frozenset({
+    'click here', 'here', 'read more', 'more', 'link',
+    'this', 'this link', 'learn more', 'details'
+})
+
+# Every Quarto construct fixed by _fix_quarto_constructs, as one alternation
+# dispatched on match.lastgroup so the body is scanned once:
+# - chunk:   code chunks (```{r} or ```{python} etc.), matched whole
+# - callout: ::: {.callout-note} openers
+# - tabset:  ::: {.panel-tabset} openers
+# - div:     generic ::: {#id .class} divs at the start of a line
+# - figure:  ![Caption](image.png){#fig-id fig-alt="alt text"}
+# Only callout and tabset openers are matched, so the figures and divs
+# inside them are still visited.
+_QUARTO_RE = re.compile(
+    r'(?P<chunk>(?P<chunk_open>```\{(?P<chunk_lang>\w+)(?P<chunk_opts>[^}]*)\}\n)'
+    r'(?P<chunk_body>(?s:.*?))(?P<chunk_close>```))'
+    r'|(?P<callout>:::\s*\{\.callout-(?P<callout_type>\w+)(?P<callout_attrs>[^}]*)\}\s*\n)'
+    r'|(?P<tabset>:::\s*\{\.panel-tabset(?P<tabset_attrs>[^}]*)\}\s*\n)'
+    r'|(?P<div>^:::[^\S\n]*\{(?P<div_attrs>[^}\n]+)\})'
+    r'|(?P<figure>!\[(?P<fig_caption>[^\]]*)\]\((?P<fig_src>[^)]+)\)(?P<fig_attrs>\{[^}]*\})?)',
+    re.MULTILINE
+)
+
+# Literal openers of every _QUARTO_RE branch. The named groups hide those
+# literals from the regex engine, so finditer would try all five branches at
+# every offset; searching for the openers first skips straight to candidates.
+_QUARTO_ANCHOR_RE = re.compile(r'```\{|:::|!\[')
+
+# Code chunk captions and alt text requested per batched Claude call. Small
+# batches keep each response short and let several batches run at once.
+CAPTION_BATCH_SIZE = 10
+
+# Leading characters of a code chunk sent to Claude; the snippet is also the
+# unit of deduplication and caching for generated captions and alt text
+_CODE_SNIPPET_CHARS = 500
+
+# Generated text goes inside a double-quoted #| option, so its double quotes
+# become single quotes
+_QUOTE_TABLE = str.maketrans('"', "'")
+
+# Version of the processed-document cache. Bump it whenever a change to the
+# QMD/Markdown fixers, the accessibility checks, or the Claude prompts would
+# change a processed document or its report, so earlier results are ignored.
+_CACHE_VERSION = 1
+
+# Code chunk #| options, callout heading titles, and div openers
+_OPT_RE = re.compile(r'#\|\s*(\w+[-\w]*)\s*:')
+_CALLOUT_HEADING_RE = re.compile(r'\s*##')
+_DIV_RE = re.compile(r':::\s*\{([^}]+)\}')
+
+# Default accessible titles for callouts that lack one
+_CALLOUT_TITLES = {
+    'note': 'Note',
+    'warning': 'Warning',
+    'tip': 'Tip',
+    'important': 'Important',
+    'caution': 'Caution'
+}
+
+# Div classes that map to a landmark role, checked in order
+_DIV_ROLES = (
+    ('.sidebar', 'complementary', 'sidebar'),
+    ('.footer', 'contentinfo', 'footer'),
+    ('.nav', 'navigation', 'nav'),
+)
+
+# Code chunk calls that produce a figure or a table, most common first so
+# the alternation usually succeeds on its first branch at a matching offset
+_FIG_KW_RE = re.compile('|'.join(map(re.escape, (
+    'plt.', 'ggplot', 'ax.', 'plot(', 'geom_', 'fig,',
+    'figure(', 'matplotlib', 'seaborn', 'chart'
+))))
+_TBL_KW_RE = re.compile('|'.join(map(re.escape, (
+    'head(', 'kable', 'summary(', 'gt(', 'print(data',
+    'DT::datatable', 'reactable'
+))))
+
+
+def _line_starts(content: str) -> List[int]:
+    """Offset of the start of each line, so line numbers can be found with bisect_right."""
+    starts = [0]
+    pos = content.find('\n')
+    while pos != -1:
+        starts.append(pos + 1)
+        pos = content.find('\n', pos + 1)
+    return starts
+
+
+def _iter_quarto_constructs(content: str):
+    """Yield the same matches as _QUARTO_RE.finditer, trying the regex only at construct openers."""
+    match = _QUARTO_RE.match
+    search = _QUARTO_ANCHOR_RE.search
+    pos = 0
+    while True:
+        anchor = search(content, pos)
+        if anchor is None:
+            return
+        start = anchor.start()
+        construct = match(content, start)
+        if construct:
+            yield construct
+            pos = construct.end()
+        else:
+            # Openers can overlap (e.g. '::::'), so retry one character on
+            pos = start + 1
+
+
 # Named colors to hex mapping for contrast checking
 # From quarto-wcag-compliance skill: validate_contrast.py
 NAMED_COLORS: Dict[str, str] = {
@@ -71,45 +226,22 @@ class QMDProcessor(MarkdownProcessor):
     WCAG 2.1 AA accessibility checking and fixing.
     """
 
-    def __init__(self, claude_client: Optional[ClaudeClient] = None):
+    FILE_EXTENSION: ClassVar[str] = ".qmd"
+
+    def __init__(self, claude_client: Optional[ClaudeClient] = None, llm_cache: Optional[LLMCache] = None):
         super().__init__(claude_client)
+        # Generated captions and alt text are reused across runs on unchanged code
+        self.llm_cache = llm_cache or LLMCache()
+        # Set when a Claude request fails, so the document result is not cached
+        self._generation_failed = False
 
     def get_file_extension(self) -> str:
-        return ".qmd"
+        return self.FILE_EXTENSION
 
     # =========================================================================
     # Color Contrast Utilities (from validate_contrast.py)
     # =========================================================================
 
-    def _hex_to_rgb(self, hex_color: str) -> Tuple[int, int, int]:
-        """Convert hex color to RGB tuple."""
-        hex_color = hex_color.lstrip('#')
-        if len(hex_color) == 3:
-            hex_color = ''.join([c * 2 for c in hex_color])
-        if len(hex_color) != 6:
-            raise ValueError(f"Invalid hex color: #{hex_color}")
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-
-    def _relative_luminance(self, rgb: Tuple[int, int, int]) -> float:
-        """Calculate relative luminance per WCAG 2.1."""
-        def channel_luminance(value: int) -> float:
-            srgb = value / 255
-            if srgb <= 0.03928:
-                return srgb / 12.92
-            return math.pow((srgb + 0.055) / 1.055, 2.4)
-        r, g, b = rgb
-        return 0.2126 * channel_luminance(r) + 0.7152 * channel_luminance(g) + 0.0722 * channel_luminance(b)
-
-    def _contrast_ratio(self, color1: str, color2: str) -> float:
-        """Calculate contrast ratio between two colors."""
-        rgb1 = self._hex_to_rgb(color1)
-        rgb2 = self._hex_to_rgb(color2)
-        lum1 = self._relative_luminance(rgb1)
-        lum2 = self._relative_luminance(rgb2)
-        lighter = max(lum1, lum2)
-        darker = min(lum1, lum2)
-        return (lighter + 0.05) / (darker + 0.05)
-
     def _normalize_color(self, color: str) -> str:
         """Normalize color to hex format."""
         color = color.lower().strip()
@@ -121,33 +253,36 @@ class QMDProcessor(MarkdownProcessor):
 
     def _check_color_contrast(self, content: str) -> None:
         """Check color definitions in QMD for WCAG AA contrast compliance."""
-        # Patterns for colors in YAML/CSS
-        color_patterns = [
-            (r'color:\s*["\']?(#[0-9A-Fa-f]{3,6})["\']?', 'text color'),
-            (r'linkcolor:\s*([a-zA-Z]+|#[0-9A-Fa-f]{3,6})', 'link color'),
-            (r'urlcolor:\s*([a-zA-Z]+|#[0-9A-Fa-f]{3,6})', 'URL color'),
-            (r'background(?:-color)?:\s*(#[0-9A-Fa-f]{3,6})', 'background'),
-        ]
-
-        lines = content.split('\n')
-        for i, line in enumerate(lines):
-            for pattern, color_type in color_patterns:
-                match = re.search(pattern, line, re.IGNORECASE)
-                if match:
-                    color = self._normalize_color(match.group(1))
-                    if color.startswith('#'):
-                        # Check against white background (common default)
-                        try:
-                            ratio = self._contrast_ratio(color, '#FFFFFF')
-                            if ratio < 4.5:
-                                self.report.add_issue(AccessibilityIssue(
-                                    wcag_criterion="1.4.3",
-                                    severity=Severity.WARNING,
-                                    description=f"Low contrast {color_type}: {color} has {ratio:.1f}:1 ratio (need 4.5:1)",
-                                    location=f"Line {i+1}"
-                                ))
-                        except ValueError:
-                            pass  # Skip invalid colors
+        # Scan the whole text once per pattern, keeping the first match of
+        # each pattern on a line; the line index is only built once a hit occurs
+        hits = []
+        line_starts = None
+        for pattern_idx, (pattern, color_type) in enumerate(_COLOR_PATTERNS):
+            last_line = 0
+            for match in pattern.finditer(content):
+                if line_starts is None:
+                    line_starts = _line_starts(content)
+                line_num = bisect_right(line_starts, match.start())
+                if line_num == last_line:
+                    continue
+                last_line = line_num
+                hits.append((line_num, pattern_idx, color_type, match.group(1)))
+
+        for line_num, _, color_type, raw_color in sorted(hits):
+            color = self._normalize_color(raw_color)
+            if color.startswith('#'):
+                # Check against white background (common default)
+                try:
+                    ratio = contrast_ratio(color, '#FFFFFF')
+                    if ratio < 4.5:
+                        self.report.add_issue(AccessibilityIssue(
+                            wcag_criterion="1.4.3",
+                            severity=Severity.WARNING,
+                            description=f"Low contrast {color_type}: {color} has {ratio:.1f}:1 ratio (need 4.5:1)",
+                            location=f"Line {line_num}"
+                        ))
+                except ValueError:
+                    pass  # Skip invalid colors
 
     # =========================================================================
     # Unicode Fixing (from fix_unicode.py)
@@ -158,22 +293,38 @@ class QMDProcessor(MarkdownProcessor):
         issues = []
         lines = content.split('\n')
         for line_num, line in enumerate(lines, 1):
-            for i, char in enumerate(line):
-                if ord(char) > 127 and char in UNICODE_REPLACEMENTS:
-                    start = max(0, i - 10)
-                    end = min(len(line), i + 11)
-                    context = line[start:end]
-                    issues.append((char, line_num, context))
+            if line.isascii():
+                continue
+
+            hits = _SINGLE_CHAR_KEYS.intersection(line)
+            if not hits:
+                continue
+
+            # Locate every occurrence, then report them in line order
+            positions = []
+            for char in hits:
+                i = line.find(char)
+                while i != -1:
+                    positions.append((i, char))
+                    i = line.find(char, i + 1)
+            positions.sort()
+
+            for i, char in positions:
+                start = max(0, i - 10)
+                end = min(len(line), i + 11)
+                context = line[start:end]
+                issues.append((char, line_num, context))
         return issues
 
     def _fix_unicode_chars(self, content: str) -> str:
         """Replace Unicode characters with ASCII equivalents for pdflatex."""
-        count = 0
-        for old, new in UNICODE_REPLACEMENTS.items():
-            if old in content:
-                occurrences = content.count(old)
-                content = content.replace(old, new)
-                count += occurrences
+        # Multi-codepoint keys first: '⚠️' starts with the single-codepoint key '⚠'
+        content, count = _MULTI_CHAR_RE.subn(lambda m: UNICODE_REPLACEMENTS[m.group(0)], content)
+
+        present = _SINGLE_CHAR_KEYS.intersection(content)
+        if present:
+            count += sum(content.count(char) for char in present)
+            content = content.translate(_UNICODE_TRANSLATION)
 
         if count > 0:
             self.report.add_fix(f"Replaced {count} Unicode character(s) with ASCII equivalents for PDF compatibility")
@@ -182,37 +333,26 @@ class QMDProcessor(MarkdownProcessor):
 
     def _check_unicode_warnings(self, content: str) -> None:
         """Check for Unicode characters that may cause pdflatex errors (warning only)."""
-        problematic_chars = {
-            '\u274c': 'cross mark',       # ❌
-            '\u2713': 'checkmark',        # ✓
-            '\u2714': 'checkmark',        # ✔
-            '\U0001F7E2': 'green circle', # 🟢
-            '\U0001F7E1': 'yellow circle',# 🟡
-            '\U0001F534': 'red circle',   # 🔴
-            '\u26a0': 'warning sign',     # ⚠
-            '\U0001F4A1': 'lightbulb',    # 💡
-            '\U0001F4DD': 'memo',         # 📝
-            '\u201c': 'left smart quote', # "
-            '\u201d': 'right smart quote',# "
-            '\u2018': 'left smart quote', # '
-            '\u2019': 'right smart quote',# '
-            '\u2014': 'em dash',          # —
-            '\u2013': 'en dash',          # –
-            '\u2026': 'ellipsis',         # …
-        }
-
-        found_chars = set()
-        lines = content.split('\n')
-        for i, line in enumerate(lines):
-            for char, name in problematic_chars.items():
-                if char in line and char not in found_chars:
-                    found_chars.add(char)
-                    self.report.add_issue(AccessibilityIssue(
-                        wcag_criterion="PDF-COMPAT",
-                        severity=Severity.INFO,
-                        description=f"Unicode '{char}' ({name}) replaced for pdflatex compatibility",
-                        location=f"Line {i+1}"
-                    ))
+        # One pass over the content finds which characters occur at all
+        present = _PROBLEMATIC_CHAR_SET.intersection(content)
+        if not present:
+            return
+
+        # Report the first occurrence of each character, in line order
+        line_starts = _line_starts(content)
+        hits = []
+        for char_idx, (char, name) in enumerate(_PROBLEMATIC_CHARS.items()):
+            if char in present:
+                pos = content.find(char)
+                hits.append((bisect_right(line_starts, pos), char_idx, char, name))
+
+        for line_num, _, char, name in sorted(hits):
+            self.report.add_issue(AccessibilityIssue(
+                wcag_criterion="PDF-COMPAT",
+                severity=Severity.INFO,
+                description=f"Unicode '{char}' ({name}) replaced for pdflatex compatibility",
+                location=f"Line {line_num}"
+            ))
 
     # =========================================================================
     # Enhanced Link Text Checking (from check_quarto_accessibility.py)
@@ -220,34 +360,35 @@ class QMDProcessor(MarkdownProcessor):
 
     def _check_link_text_quality(self, content: str) -> None:
         """Enhanced link text validation from skill."""
-        lines = content.split('\n')
-        link_pattern = re.compile(r'\[([^\]]+)\]\(([^)]+)\)')
-
-        bad_link_texts = [
-            'click here', 'here', 'read more', 'more', 'link',
-            'this', 'this link', 'learn more', 'details'
-        ]
-
-        for i, line in enumerate(lines):
-            for match in link_pattern.finditer(line):
-                link_text = match.group(1).strip().lower()
-                if link_text in bad_link_texts:
-                    self.report.add_issue(AccessibilityIssue(
-                        wcag_criterion="2.4.4",
-                        severity=Severity.ERROR,
-                        description=f"Non-descriptive link text: '{match.group(1)}'",
-                        location=f"Line {i+1}",
-                        suggestion="Use descriptive text that indicates the link destination"
-                    ))
-                elif len(link_text) < 3:
-                    self.report.add_issue(AccessibilityIssue(
-                        wcag_criterion="2.4.4",
-                        severity=Severity.WARNING,
-                        description=f"Link text may be too brief: '{match.group(1)}'",
-                        location=f"Line {i+1}"
-                    ))
-
-    def process(self, content: bytes, filename: str = "") -> bytes:
+        line_starts = None
+
+        for match in _LINK_RE.finditer(content):
+            link_text = match.group(1).strip().lower()
+            is_generic = link_text in _BAD_LINK_TEXTS
+            if not is_generic and len(link_text) >= 3:
+                continue
+
+            if line_starts is None:
+                line_starts = _line_starts(content)
+            line_num = bisect_right(line_starts, match.start())
+
+            if is_generic:
+                self.report.add_issue(AccessibilityIssue(
+                    wcag_criterion="2.4.4",
+                    severity=Severity.ERROR,
+                    description=f"Non-descriptive link text: '{match.group(1)}'",
+                    location=f"Line {line_num}",
+                    suggestion="Use descriptive text that indicates the link destination"
+                ))
+            else:
+                self.report.add_issue(AccessibilityIssue(
+                    wcag_criterion="2.4.4",
+                    severity=Severity.WARNING,
+                    description=f"Link text may be too brief: '{match.group(1)}'",
+                    location=f"Line {line_num}"
+                ))
+
+    def process(self, content: bytes, filename: str = "", report_stream: Optional[TextIO] = None) -> bytes:
         """
         Process QMD for WCAG 2.1 AA accessibility.
 
@@ -259,23 +400,90 @@ class QMDProcessor(MarkdownProcessor):
         Args:
             content: QMD content as bytes
             filename: Original filename
+            report_stream: Optional file to stream issues to as JSON lines
 
         Returns:
             Accessible QMD as bytes
         """
-        self.reset_report()
+        self.reset_report(report_stream)
+
+        # A document processed before needs no passes and no Claude calls
+        document_key = self._document_cache_key(content)
+        cached = self._load_cached_document(document_key)
+        if cached is not None:
+            return cached
+
+        self._generation_failed = False
+        result = self._process_document(content)
+
+        # Don't keep output that is missing text because a Claude request failed,
+        # or whose issues went to a report stream and cannot be replayed
+        if not self._generation_failed and not self.report.warnings and self.report.issue_sink is None:
+            self._store_cached_document(document_key, result)
+
+        return result
+
+    def _document_cache_key(self, content: bytes) -> str:
+        """Cache key for the processed form of a whole document."""
+        return LLMCache.make_key(
+            model=self.claude_client.model,
+            vision_model=self.claude_client.vision_model,
+            fast_model=self.claude_client.fast_model,
+            kind='qmd-document',
+            version=_CACHE_VERSION,
+            source=hashlib.sha256(content).hexdigest()
+        )
+
+    def _load_cached_document(self, key: str) -> Optional[bytes]:
+        """Return a cached processed document and replay its report, or None if not cached."""
+        cached = self.llm_cache.get(key)
+        if cached is None:
+            return None
 
+        try:
+            entry = json.loads(cached)
+            output = entry['output'].encode('utf-8')
+            issues = [AccessibilityIssue.from_dict(issue) for issue in entry['issues']]
+            fixes = entry['fixes_applied']
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+        for issue in issues:
+            self.report.add_issue(issue)
+        for fix in fixes:
+            self.report.add_fix(fix)
+        return output
+
+    def _store_cached_document(self, key: str, result: bytes):
+        """Cache a processed document together with the report it produced."""
+        try:
+            output = result.decode('utf-8')
+        except UnicodeDecodeError:
+            return
+
+        self.llm_cache.set(key, json.dumps({
+            'output': output,
+            'issues': [issue.to_dict() for issue in self.report.issues],
+            'fixes_applied': self.report.fixes_applied,
+        }))
+
+    def _process_document(self, content: bytes) -> bytes:
+        """Run every fix and check over a QMD document; see process()."""
         qmd_str = content.decode('utf-8', errors='replace')
+        decoded = qmd_str
 
         # =====================================================================
         # Pre-processing: Fix Unicode for pdflatex compatibility
         # (from quarto-wcag-compliance skill: fix_unicode.py)
         # =====================================================================
-        self._check_unicode_warnings(qmd_str)  # Report what will be fixed
-        qmd_str = self._fix_unicode_chars(qmd_str)
+        # Pure-ASCII documents (the common case) have nothing to replace
+        if not qmd_str.isascii():
+            self._check_unicode_warnings(qmd_str)  # Report what will be fixed
+            qmd_str = self._fix_unicode_chars(qmd_str)
 
         # Separate YAML frontmatter
         frontmatter, body = self._split_frontmatter(qmd_str)
+        split_body = body
 
         # Process YAML frontmatter for accessibility
         if frontmatter:
@@ -307,34 +515,53 @@ class QMDProcessor(MarkdownProcessor):
         # =====================================================================
         self._check_link_text_quality(body)
 
-        # Apply QMD-specific code chunk accessibility
-        body = self._fix_quarto_code_chunks(body)
-
-        # Apply Quarto-specific fixes
-        body = self._fix_quarto_figures(body)
-        body = self._fix_quarto_callouts(body)
-        body = self._fix_quarto_tabsets(body)
-        body = self._add_div_accessibility(body)
+        # Apply QMD-specific code chunk, figure, callout, tabset, and div fixes
+        body = self._fix_quarto_constructs(body)
 
         # Recombine
+        lossless = qmd_str is decoded and '\ufffd' not in decoded
         if frontmatter:
-            result = f"---\n{frontmatter}---\n{body}"
+            header = f"---\n{frontmatter}---\n"
+            if body is split_body and lossless:
+                # Only the frontmatter changed, so encode just the new header and
+                # reuse the original bytes of the body
+                prefix = decoded[:len(decoded) - len(body)]
+                return header.encode('utf-8') + content[len(prefix.encode('utf-8')):]
+            result = header + body
+        elif body is decoded and lossless:
+            # Every pass returned its input unchanged and decoding was lossless,
+            # so the original bytes are already the answer
+            return content
         else:
             result = body
 
         return result.encode('utf-8')
 
     def _split_frontmatter(self, content: str) -> tuple[str, str]:
-        """Split YAML frontmatter from body."""
-        if not content.startswith('---'):
+        """Split YAML frontmatter from body.
+
+        Accepts \r\n line endings from files saved on Windows.
+        """
+        if content.startswith('---\n'):
+            start = 4
+        elif content.startswith('---\r\n'):
+            start = 5
+        else:
+            return '', content
+
+        # Find the closing --- (the first line starting with it)
+        close = content.find('\n---', start)
+        if close == -1:
             return '', content
 
-        # Find the closing ---
-        match = re.match(r'^---\n(.*?)\n---\n?(.*)', content, re.DOTALL)
-        if match:
-            return match.group(1), match.group(2)
+        end = close - 1 if close > start and content[close - 1] == '\r' else close
+        after = close + 4
+        if content.startswith('\r', after):
+            after += 1
+        if content.startswith('\n', after):
+            after += 1
 
-        return '', content
+        return content[start:end], content[after:]
 
     def _process_frontmatter(self, frontmatter: str) -> str:
         """Add accessibility-related YAML options."""
@@ -344,14 +571,28 @@ class QMDProcessor(MarkdownProcessor):
         while lines and not lines[-1].strip():
             lines.pop()
 
+        # Walk the frontmatter once, noting each key the checks below need
+        has_lang = has_title = has_html = has_toc_title = False
+        toc_idx = None
+        for i, line in enumerate(lines):
+            stripped = line.strip()
+            if stripped.startswith('lang:'):
+                has_lang = True
+            elif stripped.startswith('title:'):
+                has_title = True
+            if 'html:' in line:
+                has_html = True
+            if 'toc-title:' in line:
+                has_toc_title = True
+            elif toc_idx is None and 'toc:' in line and 'true' in line.lower():
+                toc_idx = i
+
         # Check for lang
-        has_lang = any(line.strip().startswith('lang:') for line in lines)
         if not has_lang:
             lines.append('lang: en')
             self.report.add_fix("Added lang: en to frontmatter")
 
         # Check for title
-        has_title = any(line.strip().startswith('title:') for line in lines)
         if not has_title:
             self.report.add_issue(AccessibilityIssue(
                 wcag_criterion="2.4.2",
@@ -359,322 +600,367 @@ class QMDProcessor(MarkdownProcessor):
                 description="Document missing title in frontmatter"
             ))
 
-        # Check for accessibility format options
-        format_lines = []
-        in_format = False
-        format_indent = 0
-
-        for i, line in enumerate(lines):
-            if re.match(r'^format:', line):
-                in_format = True
-                format_indent = len(line) - len(line.lstrip())
-            elif in_format:
-                current_indent = len(line) - len(line.lstrip())
-                if line.strip() and current_indent <= format_indent:
-                    in_format = False
-
-        # Add accessibility hints for HTML format
-        if any('html:' in line for line in lines):
-            # Check for toc-title
-            if not any('toc-title:' in line for line in lines):
-                # Add toc-title for screen readers
-                for i, line in enumerate(lines):
-                    if 'toc:' in line and 'true' in line.lower():
-                        # Match the indentation of the toc: line
-                        indent = len(line) - len(line.lstrip())
-                        indent_str = ' ' * indent
-                        lines.insert(i + 1, f'{indent_str}toc-title: "Table of Contents"')
-                        self.report.add_fix("Added toc-title for accessibility")
-                        break
+        # Add toc-title for screen readers to HTML output with a table of contents
+        if has_html and not has_toc_title and toc_idx is not None:
+            # Match the indentation of the toc: line
+            line = lines[toc_idx]
+            indent_str = ' ' * (len(line) - len(line.lstrip()))
+            lines.insert(toc_idx + 1, f'{indent_str}toc-title: "Table of Contents"')
+            self.report.add_fix("Added toc-title for accessibility")
 
         # Return with trailing newline to ensure proper YAML closure
         return '\n'.join(lines) + '\n'
 
-    def _fix_quarto_code_chunks(self, content: str) -> str:
-        """Add accessibility options to Quarto code chunks that generate figures or tables."""
-        # Pattern for Quarto code chunks: ```{r} or ```{python} etc.
-        chunk_pattern = r'(```\{(\w+)([^}]*)\}\n)(.*?)(```)'
-
-        def fix_chunk(match):
-            opening = match.group(1)
-            language = match.group(2)
-            chunk_options = match.group(3)
-            chunk_body = match.group(4)
-            closing = match.group(5)
-
-            # Check if this chunk generates a figure (has ggplot, plot, etc.)
-            generates_figure = any(fig_keyword in chunk_body for fig_keyword in [
-                'ggplot', 'plot(', 'geom_', 'plt.', 'matplotlib', 'seaborn',
-                'fig,', 'ax.', 'figure(', 'chart'
-            ])
+    def _fix_quarto_constructs(self, content: str) -> str:
+        """Fix Quarto code chunks, figures, callouts, tabsets, and divs in one scan."""
+        # Every construct starts with one of these; plain Markdown skips the regex entirely
+        if '```{' not in content and ':::' not in content and '![' not in content:
+            return content
+
+        matches = list(_iter_quarto_constructs(content))
+        chunk_plans = {}
+        chunk_requests = []
+        for match in matches:
+            if match.lastgroup == 'chunk':
+                chunk_body = match.group('chunk_body')
+                plan = chunk_plans[match.start()] = self._plan_code_chunk(chunk_body)
+                chunk_requests.append((plan[3], plan[2]))
+        generated = self._generate_chunk_options(chunk_requests)
+
+        # Callouts and tabsets only count as blocks when a closing ::: follows them
+        last_fence = content.rfind(':::')
+
+        def fix_construct(match):
+            kind = match.lastgroup
+
+            if kind == 'chunk':
+                return self._fix_quarto_code_chunk(match, chunk_plans[match.start()], generated)
+            if kind == 'figure':
+                return self._fix_quarto_figure(match)
+            if kind == 'div':
+                return self._add_div_role(match.group(0), match.group('div_attrs'),
+                                          match.end('div_attrs') - match.start())
+
+            if last_fence < match.end():
+                opener = match.group(0)
+            elif kind == 'callout':
+                opener = self._fix_quarto_callout(match)
+            else:
+                opener = self._fix_quarto_tabset(match)
+
+            # A callout or tabset opening a line is also a div that may need a role
+            if match.start() == 0 or content[match.start() - 1] == '\n':
+                div_match = _DIV_RE.match(opener)
+                if div_match:
+                    opener = self._add_div_role(opener, div_match.group(1), div_match.end(1))
+            return opener
+
+        # Unchanged constructs stay inside the untouched slices around the edits
+        parts = []
+        last_end = 0
+        for match in matches:
+            replacement = fix_construct(match)
+            if replacement == match.group(0):
+                continue
+            parts.append(content[last_end:match.start()])
+            parts.append(replacement)
+            last_end = match.end()
+
+        if not parts:
+            return content
+        parts.append(content[last_end:])
+        return ''.join(parts)
+
+    def _plan_code_chunk(self, chunk_body: str) -> Tuple[List[str], int, List[str], str]:
+        """Split a code chunk body into lines and find where new options go and which are missing.
+
+        Also returns the snippet of the chunk that Claude is asked about.
+        """
+        # Check if this chunk generates a figure (has ggplot, plot, etc.)
+        generates_figure = _FIG_KW_RE.search(chunk_body) is not None
+
+        # Check if this chunk generates a table (has kable, gt, datatable, etc.)
+        generates_table = _TBL_KW_RE.search(chunk_body) is not None
+
+        # Parse existing chunk options
+        existing_options = set()
+        lines = chunk_body.split('\n')
+        first_code_line_idx = 0
+        last_option_idx = -1
+
+        for i, line in enumerate(lines):
+            if line.strip().startswith('#|'):
+                option_match = _OPT_RE.match(line)
+                if option_match:
+                    existing_options.add(option_match.group(1))
+                first_code_line_idx = i + 1
+                last_option_idx = i
+            elif line.strip() and not line.strip().startswith('#'):
+                # Found first non-option, non-comment line
+                first_code_line_idx = i
+                break
+
+        # New options go right after the existing #| options, or before the first code line
+        insert_idx = last_option_idx + 1 if last_option_idx >= 0 else first_code_line_idx
+
+        missing_options = []
+
+        # Figures need a caption and alt text
+        if generates_figure:
+            if 'fig-cap' not in existing_options:
+                missing_options.append('fig-cap')
+            if 'fig-alt' not in existing_options:
+                missing_options.append('fig-alt')
+
+        # Tables need a caption
+        if generates_table and 'tbl-cap' not in existing_options:
+            missing_options.append('tbl-cap')
+
+        return lines, insert_idx, missing_options, chunk_body[:_CODE_SNIPPET_CHARS]
+
+    def _generate_chunk_options(self, chunk_requests: List[Tuple[str, List[str]]]) -> Dict[Tuple[str, str], Optional[str]]:
+        """Request every missing code chunk caption and alt text from Claude.
+
+        Takes (code snippet, missing options) pairs and returns generated text keyed by
+        (option, code snippet); chunks with identical snippets share one request.
+        """
+        keys = list(dict.fromkeys(
+            (option, snippet)
+            for snippet, missing_options in chunk_requests
+            for option in missing_options
+        ))
+        if not keys:
+            return {}
+
+        # Text generated on an earlier run needs no request at all
+        generated = {}
+        for key in keys:
+            cached = self.llm_cache.get(self._llm_cache_key(*key))
+            if cached:
+                generated[key] = cached
+
+        pending = [key for key in keys if key not in generated]
+        if not pending:
+            return generated
+
+        batches = [pending[i:i + CAPTION_BATCH_SIZE] for i in range(0, len(pending), CAPTION_BATCH_SIZE)]
+
+        # Claude calls are network-bound, so threads overlap their round-trips
+        with ThreadPoolExecutor(max_workers=min(MAX_CLAUDE_WORKERS, len(batches))) as executor:
+            for batch_texts in executor.map(self._generate_captions_batch, batches):
+                generated.update(batch_texts)
+
+        # Anything a batch did not answer is requested on its own
+        generators = {
+            'fig-cap': self._generate_figure_caption,
+            'fig-alt': self._generate_figure_alt,
+            'tbl-cap': self._generate_table_caption,
+        }
+        missing = [key for key in pending if key not in generated]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(MAX_CLAUDE_WORKERS, len(missing))) as executor:
+                texts = executor.map(lambda key: generators[key[0]](key[1]), missing)
+                generated.update(zip(missing, texts))
+
+        for key in pending:
+            if generated.get(key):
+                self.llm_cache.set(self._llm_cache_key(*key), generated[key])
+            else:
+                self._generation_failed = True
 
-            # Check if this chunk generates a table (has kable, gt, datatable, etc.)
-            generates_table = any(tbl_keyword in chunk_body for tbl_keyword in [
-                'kable', 'knitr::kable', 'gt(', 'DT::datatable', 'reactable',
-                'print(data', 'head(', 'summary('
+        return generated
+
+    def _llm_cache_key(self, kind: str, source: str) -> str:
+        """Cache key for generated text of one kind (fig-cap, fig-alt, ...) about a code chunk."""
+        return LLMCache.make_key(model=self.claude_client.fast_model, kind=kind, source=source)
+
+    def _generate_captions_batch(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], str]:
+        """Generate several code chunk captions and alt texts with one Claude request."""
+        try:
+            results = self.claude_client.describe_code_chunks([
+                {'id': i, 'kind': option, 'code': snippet}
+                for i, (option, snippet) in enumerate(keys)
             ])
+        except Exception:
+            return {}
+
+        generated = {}
+        for result in results:
+            try:
+                i = int(result['id'])
+                text = str(result['text']).translate(_QUOTE_TABLE).strip()
+            except (KeyError, TypeError, ValueError):
+                continue
+            if 0 <= i < len(keys) and text:
+                generated[keys[i]] = text
+        return generated
+
+    def _fix_quarto_code_chunk(self, match: re.Match, plan: Tuple[List[str], int, List[str], str],
+                               generated: Dict[Tuple[str, str], Optional[str]]) -> str:
+        """Add accessibility options to a Quarto code chunk that generates figures or tables."""
+        lines, insert_idx, missing_options, snippet = plan
+
+        new_options = []
+        for option in missing_options:
+            text = generated.get((option, snippet))
+            if text:
+                new_options.append(f'#| {option}: "{text}"')
+                self.report.add_fix(f"Added {option} to code chunk")
+
+        if not new_options:
+            return match.group(0)
 
-            # Parse existing chunk options
-            existing_options = set()
-            lines = chunk_body.split('\n')
-            first_code_line_idx = 0
-
-            for i, line in enumerate(lines):
-                if line.strip().startswith('#|'):
-                    option_match = re.match(r'#\|\s*(\w+[-\w]*)\s*:', line)
-                    if option_match:
-                        existing_options.add(option_match.group(1))
-                    first_code_line_idx = i + 1
-                elif line.strip() and not line.strip().startswith('#'):
-                    # Found first non-option, non-comment line
-                    first_code_line_idx = i
-                    break
-
-            new_options = []
-
-            # Add figure accessibility options if needed
-            if generates_figure:
-                if 'fig-cap' not in existing_options:
-                    # Generate caption using Claude
-                    try:
-                        caption = self._generate_figure_caption(chunk_body)
-                        if caption:
-                            new_options.append(f'#| fig-cap: "{caption}"')
-                            self.report.add_fix(f"Added fig-cap to code chunk")
-                    except Exception:
-                        new_options.append('#| fig-cap: "Figure description needed"')
-                        self.report.add_fix("Added placeholder fig-cap to code chunk")
-
-                if 'fig-alt' not in existing_options:
-                    # Generate alt text using Claude
-                    try:
-                        alt_text = self._generate_figure_alt(chunk_body)
-                        if alt_text:
-                            new_options.append(f'#| fig-alt: "{alt_text}"')
-                            self.report.add_fix(f"Added fig-alt to code chunk")
-                    except Exception:
-                        new_options.append('#| fig-alt: "Alternative text for figure needed"')
-                        self.report.add_fix("Added placeholder fig-alt to code chunk")
-
-            # Add table accessibility options if needed
-            if generates_table:
-                if 'tbl-cap' not in existing_options:
-                    # Generate table caption using Claude
-                    try:
-                        caption = self._generate_table_caption(chunk_body)
-                        if caption:
-                            new_options.append(f'#| tbl-cap: "{caption}"')
-                            self.report.add_fix(f"Added tbl-cap to code chunk")
-                    except Exception:
-                        new_options.append('#| tbl-cap: "Table description needed"')
-                        self.report.add_fix("Added placeholder tbl-cap to code chunk")
-
-            # Insert new options after existing options
-            if new_options:
-                # Find where to insert (after existing #| options)
-                insert_idx = first_code_line_idx
-                for i, line in enumerate(lines):
-                    if line.strip().startswith('#|'):
-                        insert_idx = i + 1
-
-                # Insert new options
-                for opt in reversed(new_options):
-                    lines.insert(insert_idx, opt)
-
-                chunk_body = '\n'.join(lines)
-
-            return opening + chunk_body + closing
-
-        return re.sub(chunk_pattern, fix_chunk, content, flags=re.DOTALL)
-
-    def _generate_figure_caption(self, code: str) -> str:
-        """Generate figure caption using Claude based on code."""
+        # Insert new options after existing options with one splice rather than an insert per option
+        lines[insert_idx:insert_idx] = new_options
+        return ''.join((match.group('chunk_open'), '\n'.join(lines), match.group('chunk_close')))
+
+    def _generate_figure_caption(self, snippet: str) -> str:
+        """Generate figure caption using Claude based on a code snippet."""
         try:
             response = self.claude_client.client.messages.create(
-                model=self.claude_client.model,
+                model=self.claude_client.fast_model,
                 max_tokens=100,
                 system="Generate a brief, descriptive figure caption (1 sentence) based on this plotting code. Return ONLY the caption text, no quotes.",
                 messages=[{
                     "role": "user",
-                    "content": f"Code:\n{code[:500]}\n\nGenerate a caption:"
+                    "content": f"Code:\n{snippet}\n\nGenerate a caption:"
                 }]
             )
-            return response.content[0].text.strip().replace('"', "'")
+            return response.content[0].text.translate(_QUOTE_TABLE).strip()
         except Exception:
             return None
 
-    def _generate_figure_alt(self, code: str) -> str:
-        """Generate figure alt text using Claude based on code."""
+    def _generate_figure_alt(self, snippet: str) -> str:
+        """Generate figure alt text using Claude based on a code snippet."""
         try:
             response = self.claude_client.client.messages.create(
-                model=self.claude_client.model,
+                model=self.claude_client.fast_model,
                 max_tokens=150,
                 system="Generate alt text for a figure based on this plotting code. Describe the type of chart and what data it shows. Return ONLY the alt text, no quotes.",
                 messages=[{
                     "role": "user",
-                    "content": f"Code:\n{code[:500]}\n\nGenerate alt text:"
+                    "content": f"Code:\n{snippet}\n\nGenerate alt text:"
                 }]
             )
-            return response.content[0].text.strip().replace('"', "'")
+            return response.content[0].text.translate(_QUOTE_TABLE).strip()
         except Exception:
             return None
 
-    def _generate_table_caption(self, code: str) -> str:
-        """Generate table caption using Claude based on code."""
+    def _generate_table_caption(self, snippet: str) -> str:
+        """Generate table caption using Claude based on a code snippet."""
         try:
             response = self.claude_client.client.messages.create(
-                model=self.claude_client.model,
+                model=self.claude_client.fast_model,
                 max_tokens=100,
                 system="Generate a brief, descriptive table caption (1 sentence) based on this code that creates a table. Return ONLY the caption text, no quotes.",
                 messages=[{
                     "role": "user",
-                    "content": f"Code:\n{code[:500]}\n\nGenerate a table caption:"
+                    "content": f"Code:\n{snippet}\n\nGenerate a table caption:"
                 }]
             )
-            return response.content[0].text.strip().replace('"', "'")
+            return response.content[0].text.translate(_QUOTE_TABLE).strip()
         except Exception:
             return None
 
-    def _fix_quarto_figures(self, content: str) -> str:
-        """Fix accessibility for Quarto figure syntax."""
-        # Quarto figure syntax: ![Caption](image.png){#fig-id fig-alt="alt text"}
-
-        # Pattern for figures without fig-alt
-        fig_pattern = r'!\[([^\]]*)\]\(([^)]+)\)(\{[^}]*\})?'
-
-        def fix_figure(match):
-            caption = match.group(1)
-            src = match.group(2)
-            attrs = match.group(3) or ''
-
-            # Check if fig-alt exists
-            if 'fig-alt=' in attrs:
-                return match.group(0)
-
-            # Need to add fig-alt
-            if not caption.strip():
-                # Generate alt text
-                try:
-                    alt_text = self.claude_client.generate_alt_text(
-                        image_context=f"Quarto figure with source: {src}"
-                    )
+    def _generate_math_description(self, math_content: str) -> str:
+        """Generate description for math equation using Claude, noting failed requests."""
+        description = super()._generate_math_description(math_content)
+        if description is None:
+            self._generation_failed = True
+        return description
+
+    def _fix_quarto_figure(self, match: re.Match) -> str:
+        """Add fig-alt to a Quarto figure: ![Caption](image.png){#fig-id fig-alt="alt text"}."""
+        caption = match.group('fig_caption')
+        src = match.group('fig_src')
+        attrs = match.group('fig_attrs') or ''
+
+        # Check if fig-alt exists
+        if 'fig-alt=' in attrs:
+            return match.group(0)
 
-                    if alt_text == "DECORATIVE":
-                        alt_text = ""
-                    else:
-                        self.report.add_fix(f"Added fig-alt for: {src[:50]}")
+        # Need to add fig-alt
+        if not caption.strip():
+            # Generate alt text
+            try:
+                # generate_alt_text keeps its own on-disk cache of results
+                alt_text = self.claude_client.generate_alt_text(
+                    image_context=f"Quarto figure with source: {src}"
+                )
 
-                except Exception as e:
+                if alt_text == "DECORATIVE":
                     alt_text = ""
-                    self.report.add_warning(f"Could not generate alt text: {str(e)}")
-            else:
-                # Use caption as alt if no alt exists
-                alt_text = caption
+                else:
+                    self.report.add_fix(f"Added fig-alt for: {src[:50]}")
 
-            # Add fig-alt to attributes
-            if attrs:
-                # Insert fig-alt into existing braces
-                new_attrs = attrs[:-1] + f' fig-alt="{alt_text}"' + '}'
-            else:
-                new_attrs = '{' + f'fig-alt="{alt_text}"' + '}'
+            except Exception as e:
+                alt_text = ""
+                self.report.add_warning(f"Could not generate alt text: {str(e)}")
+        else:
+            # Use caption as alt if no alt exists
+            alt_text = caption
 
-            return f'![{caption}]({src}){new_attrs}'
+        # Add fig-alt to attributes
+        if attrs:
+            # Insert fig-alt into existing braces
+            new_attrs = attrs[:-1] + f' fig-alt="{alt_text}"' + '}'
+        else:
+            new_attrs = '{' + f'fig-alt="{alt_text}"' + '}'
 
-        return re.sub(fig_pattern, fix_figure, content)
+        return f'![{caption}]({src}){new_attrs}'
 
-    def _fix_quarto_callouts(self, content: str) -> str:
-        """Ensure Quarto callouts have accessible titles."""
+    def _fix_quarto_callout(self, match: re.Match) -> str:
+        """Ensure a Quarto callout has an accessible title; returns the opening line."""
         # Callout syntax: ::: {.callout-note}
         # ## Title
         # Content
         # :::
+        callout_type = match.group('callout_type')
+        attrs = match.group('callout_attrs')
+        # Check if there's a title attribute or a heading opening the callout body
+        has_title = 'title=' in attrs or _CALLOUT_HEADING_RE.match(match.string, match.end())
 
-        callout_pattern = r':::\s*\{\.callout-(\w+)([^}]*)\}\s*\n(.*?):::'
-
-        def fix_callout(match):
-            callout_type = match.group(1)
-            attrs = match.group(2)
-            content_block = match.group(3)
-
-            # Check if there's a title attribute or heading
-            has_title = 'title=' in attrs or re.match(r'^\s*##', content_block)
-
-            if not has_title:
-                # Add default accessible title based on callout type
-                titles = {
-                    'note': 'Note',
-                    'warning': 'Warning',
-                    'tip': 'Tip',
-                    'important': 'Important',
-                    'caution': 'Caution'
-                }
-                default_title = titles.get(callout_type, callout_type.capitalize())
-                new_attrs = f'{attrs} title="{default_title}"'
-                self.report.add_fix(f"Added title to {callout_type} callout")
-
-                return f'::: {{.callout-{callout_type}{new_attrs}}}\n{content_block}:::'
+        if not has_title:
+            # Add default accessible title based on callout type
+            default_title = _CALLOUT_TITLES.get(callout_type, callout_type.capitalize())
+            new_attrs = f'{attrs} title="{default_title}"'
+            self.report.add_fix(f"Added title to {callout_type} callout")
 
-            return match.group(0)
+            return f'::: {{.callout-{callout_type}{new_attrs}}}\n'
 
-        return re.sub(callout_pattern, fix_callout, content, flags=re.DOTALL)
+        return match.group(0)
 
-    def _fix_quarto_tabsets(self, content: str) -> str:
-        """Ensure Quarto tabsets are accessible."""
+    def _fix_quarto_tabset(self, match: re.Match) -> str:
+        """Ensure a Quarto tabset is accessible; returns the opening line."""
         # Tabset syntax: ::: {.panel-tabset}
         # ## Tab 1
         # Content
         # ## Tab 2
         # Content
         # :::
+        attrs = match.group('tabset_attrs')
 
-        tabset_pattern = r':::\s*\{\.panel-tabset([^}]*)\}\s*\n(.*?):::'
-
-        def fix_tabset(match):
-            attrs = match.group(1)
-            content_block = match.group(2)
-
-            # Check for group attribute (for keyboard navigation)
-            if 'group=' not in attrs:
-                # Add group for linked tabsets
-                new_attrs = f'{attrs} group="default-tabset"'
-                self.report.add_fix("Added group attribute to tabset for keyboard navigation")
-                return f'::: {{.panel-tabset{new_attrs}}}\n{content_block}:::'
-
-            return match.group(0)
+        # Check for group attribute (for keyboard navigation)
+        if 'group=' not in attrs:
+            # Add group for linked tabsets
+            new_attrs = f'{attrs} group="default-tabset"'
+            self.report.add_fix("Added group attribute to tabset for keyboard navigation")
+            return f'::: {{.panel-tabset{new_attrs}}}\n'
 
-        return re.sub(tabset_pattern, fix_tabset, content, flags=re.DOTALL)
+        return match.group(0)
 
-    def _add_div_accessibility(self, content: str) -> str:
-        """Add accessibility attributes to Quarto divs."""
-        # Generic div syntax: ::: {#id .class}
+    def _add_div_role(self, line: str, attrs: str, attrs_end: int) -> str:
+        """Add a landmark role to a Quarto div (::: {#id .class}) if its class calls for one.
 
-        # Pattern for divs that might need roles
-        div_pattern = r':::\s*\{([^}]+)\}'
+        attrs_end is the index in line just past the div's attributes.
+        """
+        if 'role=' in attrs:
+            return line
 
-        lines = content.split('\n')
-        modified = False
+        # Check for content that might need landmarks
+        for div_class, role, name in _DIV_ROLES:
+            if div_class in attrs:
+                self.report.add_fix(f"Added role='{role}' to {name} div")
+                return f'{line[:attrs_end]} role="{role}"{line[attrs_end:]}'
 
-        for i, line in enumerate(lines):
-            match = re.match(div_pattern, line)
-            if match:
-                attrs = match.group(1)
-
-                # Check for content that might need landmarks
-                if '.sidebar' in attrs and 'role=' not in attrs:
-                    lines[i] = line.replace(attrs, f'{attrs} role="complementary"')
-                    self.report.add_fix("Added role='complementary' to sidebar div")
-                    modified = True
-
-                elif '.footer' in attrs and 'role=' not in attrs:
-                    lines[i] = line.replace(attrs, f'{attrs} role="contentinfo"')
-                    self.report.add_fix("Added role='contentinfo' to footer div")
-                    modified = True
-
-                elif '.nav' in attrs and 'role=' not in attrs:
-                    lines[i] = line.replace(attrs, f'{attrs} role="navigation"')
-                    self.report.add_fix("Added role='navigation' to nav div")
-                    modified = True
-
-        if modified:
-            return '\n'.join(lines)
-        return content
+        return line
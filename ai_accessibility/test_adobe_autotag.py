@@ -10,29 +10,36 @@ Requirements:
     - pdfservices-sdk installed (pip install pdfservices-sdk)
 """
 
+import argparse
 import sys
+import traceback
 from pathlib import Path
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
-from processors.pdf_adobe_autotag_processor import AdobeAutoTagPDFProcessor
-from utils.claude_client import ClaudeClient
+SEVERITY_EMOJI = {"ERROR": "❌", "WARNING": "⚠️", "INFO": "ℹ️"}
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python test_adobe_autotag.py <input.pdf> [output.pdf]")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Test the Adobe Auto-Tag PDF processor.")
+    parser.add_argument('input', type=Path, help="PDF to tag")
+    parser.add_argument('output', type=Path, nargs='?', help="where to write the tagged PDF")
+    args = parser.parse_args()
 
-    input_path = Path(sys.argv[1])
-    output_path = Path(sys.argv[2]) if len(sys.argv) > 2 else input_path.parent / f"{input_path.stem}_adobe_tagged.pdf"
+    input_path = args.input
+    output_path = args.output or input_path.parent / f"{input_path.stem}_adobe_tagged.pdf"
 
     if not input_path.exists():
         print(f"Error: Input file not found: {input_path}")
         sys.exit(1)
 
+    # The Adobe SDK, PyMuPDF and Anthropic are slow to import, so usage errors skip them
+    from dotenv import load_dotenv
+
+    # Load environment variables
+    load_dotenv()
+
+    from processors.pdf_adobe_autotag_processor import AdobeAutoTagPDFProcessor
+    from utils.claude_client import ClaudeClient
+
     print(f"Testing Adobe Auto-Tag PDF processor...")
     print(f"Input: {input_path}")
     print(f"Output: {output_path}")
@@ -46,8 +53,7 @@ def main():
 
         # Read input PDF
         print(f"Reading input PDF: {input_path}")
-        with open(input_path, 'rb') as f:
-            content = f.read()
+        content = input_path.read_bytes()
 
         # Process PDF
         print("Processing PDF with Adobe Auto-Tag API...")
@@ -56,8 +62,7 @@ def main():
 
         # Save output
         print(f"Saving tagged PDF: {output_path}")
-        with open(output_path, 'wb') as f:
-            f.write(processed_content)
+        output_path.write_bytes(processed_content)
 
         # Display report
         report = processor.get_report()
@@ -68,21 +73,21 @@ def main():
 
         if report.fixes_applied:
             print("FIXES APPLIED:")
-            for fix in report.fixes_applied:
-                print(f"  ✓ {fix}")
+            sys.stdout.writelines(f"  ✓ {fix}\n" for fix in report.fixes_applied)
 
         if report.warnings:
             print("\nWARNINGS:")
-            for warning in report.warnings:
-                print(f"  ⚠ {warning}")
+            sys.stdout.writelines(f"  ⚠ {warning}\n" for warning in report.warnings)
 
         if report.issues:
             print("\nISSUES FOUND:")
+            lines = []
             for issue in report.issues:
-                severity_emoji = {"ERROR": "❌", "WARNING": "⚠️", "INFO": "ℹ️"}.get(issue.severity.name, "•")
-                print(f"  {severity_emoji} [{issue.wcag_criterion}] {issue.description}")
+                severity_emoji = SEVERITY_EMOJI.get(issue.severity.name, "•")
+                lines.append(f"  {severity_emoji} [{issue.wcag_criterion}] {issue.description}\n")
                 if issue.suggestion:
-                    print(f"     → {issue.suggestion}")
+                    lines.append(f"     → {issue.suggestion}\n")
+            sys.stdout.writelines(lines)
 
         print("\n" + "="*80)
         print(f"✅ SUCCESS! Tagged PDF saved to: {output_path}")
@@ -91,9 +96,10 @@ def main():
         # Check for accessibility report
         report_dir = Path(__file__).parent / "output" / "adobe_reports"
         if report_dir.exists():
-            reports = sorted(report_dir.glob(f"{input_path.stem}*.xlsx"), key=lambda x: x.stat().st_mtime, reverse=True)
-            if reports:
-                print(f"\n📊 Adobe accessibility report (XLSX): {reports[0]}")
+            # Only the newest report is shown, so there is no need to sort them all
+            newest_report = max(report_dir.glob(f"{input_path.stem}*.xlsx"), key=lambda x: x.stat().st_mtime, default=None)
+            if newest_report:
+                print(f"\n📊 Adobe accessibility report (XLSX): {newest_report}")
 
     except EnvironmentError as e:
         print(f"\n❌ ERROR: {e}")
@@ -107,7 +113,6 @@ def main():
 
     except Exception as e:
         print(f"\n❌ ERROR: {e}")
-        import traceback
         traceback.print_exc()
         sys.exit(1)
 
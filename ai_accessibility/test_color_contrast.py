@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test hex color parsing and contrast ratios used by the accessibility checks.
+
+Usage:
+    python -m pytest test_color_contrast.py
+    python test_color_contrast.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pytest
+
+from utils.accessibility import AccessibilityChecker, contrast_ratio, hex_to_rgb
+
+
+def test_hex_to_rgb_valid():
+    """Short and long forms parse, with or without '#', in either case."""
+    assert hex_to_rgb('#000000') == (0, 0, 0)
+    assert hex_to_rgb('#FFFFFF') == (255, 255, 255)
+    assert hex_to_rgb('1a2B3c') == (0x1A, 0x2B, 0x3C)
+    assert hex_to_rgb('#FFF') == (255, 255, 255)
+    assert hex_to_rgb('#f80') == (0xFF, 0x88, 0x00)
+
+
+@pytest.mark.parametrize('color', [
+    '#-fffff',   # sign
+    '#+fffff',
+    '#0x1234',   # 0x prefix
+    '#0xfff',
+    '#ff_fff',   # underscore
+    '#f_f',
+    '# fffff',   # whitespace
+    '#fffff ',
+    '#ggg',      # not hex at all
+    '#',
+    '#ff',       # wrong length
+    '#1234567',
+])
+def test_hex_to_rgb_rejects_invalid(color):
+    """Anything but exactly 3 or 6 hex digits is an invalid color."""
+    with pytest.raises(ValueError):
+        hex_to_rgb(color)
+
+
+def test_contrast_ratio():
+    """Black on white is the maximum ratio; a color against itself is 1:1."""
+    assert contrast_ratio('#000000', '#FFFFFF') == pytest.approx(21.0)
+    assert contrast_ratio('#FFFFFF', '#000') == pytest.approx(21.0)
+    assert contrast_ratio('#777777', '#777777') == pytest.approx(1.0)
+
+
+def test_estimate_color_contrast_invalid():
+    """Invalid colors report no contrast rather than raising."""
+    assert AccessibilityChecker.estimate_color_contrast('#0x1234', '#FFFFFF') == (0, False)
+    assert AccessibilityChecker.estimate_color_contrast('#777777', '#FFFFFF')[1] is False
+    assert AccessibilityChecker.estimate_color_contrast('#595959', '#FFFFFF')[1] is True
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
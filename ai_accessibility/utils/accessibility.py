@@ -1,11 +1,84 @@
 """WCAG 2.1 AA accessibility checking utilities."""
 
+import functools
+import json
 import re
+import string
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Optional, TextIO
 from enum import Enum
 
 
+# Alt text that names the file or medium instead of describing the image
+_UNHELPFUL_ALT_RE = re.compile(
+    r'^(?:(?:image\s*\d*|img|picture|photo|graphic)$|img_\d+|dsc\d+|screenshot|untitled)'
+)
+
+# Link text that is just a URL
+_URL_TEXT_RE = re.compile(r'^https?://')
+
+# Generic/non-descriptive link texts to flag
+_GENERIC_LINK_TEXTS = frozenset({
+    "click here", "click", "here", "read more", "learn more",
+    "more", "link", "this link", "info", "information",
+    "details", "more details", "continue", "go", "download"
+})
+
+# Input types that need no label of their own
+_UNLABELLED_INPUT_TYPES = frozenset({"hidden", "submit", "button", "reset", "image"})
+
+
+def _channel_luminance(value: int) -> float:
+    """Linearize one 8-bit sRGB channel per WCAG 2.1."""
+    srgb = value / 255
+    if srgb <= 0.03928:
+        return srgb / 12.92
+    return ((srgb + 0.055) / 1.055) ** 2.4
+
+
+# Linearized value for every possible 8-bit channel
+_CHANNEL_LUMINANCE = tuple(_channel_luminance(v) for v in range(256))
+
+
+def hex_to_rgb(hex_color: str) -> tuple[int, int, int]:
+    """Convert a #rgb or #rrggbb hex color to an RGB tuple."""
+    hex_color = hex_color.lstrip('#')
+    # int(..., 16) would also accept a sign, underscores, whitespace and a 0x prefix
+    if not all(c in string.hexdigits for c in hex_color):
+        raise ValueError(f"Invalid hex color: #{hex_color}")
+    if len(hex_color) == 3:
+        # Each #rgb digit expands to a doubled #rrggbb byte (0xF -> 0xFF)
+        value = int(hex_color, 16)
+        return ((value >> 8) & 0xF) * 0x11, ((value >> 4) & 0xF) * 0x11, (value & 0xF) * 0x11
+    if len(hex_color) == 6:
+        value = int(hex_color, 16)
+        return (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF
+    raise ValueError(f"Invalid hex color: #{hex_color}")
+
+
+def relative_luminance(rgb: tuple[int, int, int]) -> float:
+    """Calculate relative luminance per WCAG 2.1."""
+    r, g, b = rgb
+    return 0.2126 * _CHANNEL_LUMINANCE[r] + 0.7152 * _CHANNEL_LUMINANCE[g] + 0.0722 * _CHANNEL_LUMINANCE[b]
+
+
+@functools.lru_cache(maxsize=4096)
+def contrast_ratio(color1: str, color2: str) -> float:
+    """
+    Calculate the WCAG contrast ratio between two hex colors.
+
+    Documents reuse a small palette, so results are cached per color pair.
+
+    Raises:
+        ValueError: If either color is not a valid hex color
+    """
+    lum1 = relative_luminance(hex_to_rgb(color1))
+    lum2 = relative_luminance(hex_to_rgb(color2))
+    lighter = max(lum1, lum2)
+    darker = min(lum1, lum2)
+    return (lighter + 0.05) / (darker + 0.05)
+
+
 class Severity(Enum):
     """Severity levels for accessibility issues."""
     ERROR = "error"
@@ -13,7 +86,7 @@ class Severity(Enum):
     INFO = "info"
 
 
-@dataclass
+@dataclass(slots=True)
 class AccessibilityIssue:
     """Represents a single accessibility issue."""
     wcag_criterion: str
@@ -23,17 +96,65 @@ class AccessibilityIssue:
     suggestion: str = ""
     auto_fixed: bool = False
 
+    def to_dict(self) -> dict:
+        return {
+            "wcag_criterion": self.wcag_criterion,
+            "severity": self.severity.value,
+            "description": self.description,
+            "location": self.location,
+            "suggestion": self.suggestion,
+            "auto_fixed": self.auto_fixed
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AccessibilityIssue":
+        return cls(
+            wcag_criterion=data["wcag_criterion"],
+            severity=Severity(data["severity"]),
+            description=data["description"],
+            location=data.get("location", ""),
+            suggestion=data.get("suggestion", ""),
+            auto_fixed=data.get("auto_fixed", False)
+        )
+
 
 @dataclass
 class AccessibilityReport:
-    """Report of accessibility analysis and fixes."""
+    """
+    Report of accessibility analysis and fixes.
+
+    With an issue sink set (see set_sink), issues are written to the sink
+    and `issues` stays empty; `streamed_counts` holds the per-severity
+    counts of those not auto-fixed. Read the issues back from the sink.
+    """
     issues: list[AccessibilityIssue] = field(default_factory=list)
     fixes_applied: list[str] = field(default_factory=list)
     warnings: list[str] = field(default_factory=list)
     original_score: int = 0
     final_score: int = 0
+    # When set, issues are written here as JSON lines instead of kept in memory
+    issue_sink: Optional[TextIO] = field(default=None, repr=False)
+    # Counts of streamed issues not auto-fixed, by severity, for get_summary()
+    streamed_counts: dict[Severity, int] = field(default_factory=dict)
+
+    def set_sink(self, sink: Optional[TextIO]):
+        """
+        Stream issues to a writable text file as JSON lines.
+
+        Streamed issues are not kept in `issues`; only their counts are
+        tracked so the summary stays accurate.
+
+        Args:
+            sink: File-like object to write to, or None to keep issues in memory
+        """
+        self.issue_sink = sink
 
     def add_issue(self, issue: AccessibilityIssue):
+        if self.issue_sink is not None:
+            self.issue_sink.write(json.dumps(issue.to_dict()) + "\n")
+            if not issue.auto_fixed:
+                self.streamed_counts[issue.severity] = self.streamed_counts.get(issue.severity, 0) + 1
+            return
         self.issues.append(issue)
 
     def add_fix(self, description: str):
@@ -44,27 +165,23 @@ class AccessibilityReport:
 
     def to_dict(self) -> dict:
         return {
-            "issues": [
-                {
-                    "wcag_criterion": i.wcag_criterion,
-                    "severity": i.severity.value,
-                    "description": i.description,
-                    "location": i.location,
-                    "suggestion": i.suggestion,
-                    "auto_fixed": i.auto_fixed
-                }
-                for i in self.issues
-            ],
+            "issues": [i.to_dict() for i in self.issues],
             "fixes_applied": self.fixes_applied,
             "warnings": self.warnings,
             "original_score": self.original_score,
             "final_score": self.final_score,
+            "streamed_issue_counts": {severity.value: count for severity, count in self.streamed_counts.items()},
             "summary": self.get_summary()
         }
 
     def get_summary(self) -> str:
-        error_count = sum(1 for i in self.issues if i.severity == Severity.ERROR and not i.auto_fixed)
-        warning_count = sum(1 for i in self.issues if i.severity == Severity.WARNING and not i.auto_fixed)
+        # Count remaining issues by severity in one pass, starting from the streamed counts
+        counts = dict(self.streamed_counts)
+        for issue in self.issues:
+            if not issue.auto_fixed:
+                counts[issue.severity] = counts.get(issue.severity, 0) + 1
+        error_count = counts.get(Severity.ERROR, 0)
+        warning_count = counts.get(Severity.WARNING, 0)
         fixed_count = len(self.fixes_applied)
 
         return (
@@ -92,11 +209,7 @@ class AccessibilityChecker:
     }
 
     # Generic/non-descriptive link texts to flag
-    GENERIC_LINK_TEXTS = {
-        "click here", "click", "here", "read more", "learn more",
-        "more", "link", "this link", "info", "information",
-        "details", "more details", "continue", "go", "download"
-    }
+    GENERIC_LINK_TEXTS = _GENERIC_LINK_TEXTS
 
     @staticmethod
     def check_heading_hierarchy(headings: list[tuple[int, str]]) -> list[AccessibilityIssue]:
@@ -160,7 +273,7 @@ class AccessibilityChecker:
         """
         normalized = text.lower().strip()
 
-        if normalized in AccessibilityChecker.GENERIC_LINK_TEXTS:
+        if normalized in _GENERIC_LINK_TEXTS:
             return AccessibilityIssue(
                 wcag_criterion="2.4.4",
                 severity=Severity.WARNING,
@@ -179,7 +292,7 @@ class AccessibilityChecker:
             )
 
         # Check for URL as link text
-        if re.match(r'^https?://', normalized):
+        if _URL_TEXT_RE.match(normalized):
             return AccessibilityIssue(
                 wcag_criterion="2.4.4",
                 severity=Severity.WARNING,
@@ -220,30 +333,13 @@ class AccessibilityChecker:
             )
 
         # Check for unhelpful alt text patterns
-        unhelpful_patterns = [
-            r'^image$',
-            r'^img$',
-            r'^picture$',
-            r'^photo$',
-            r'^graphic$',
-            r'^image\s*\d*$',
-            r'^img_\d+',
-            r'^DSC\d+',
-            r'^IMG_\d+',
-            r'^screenshot',
-            r'^untitled',
-        ]
-
-        if alt:
-            normalized = alt.lower().strip()
-            for pattern in unhelpful_patterns:
-                if re.match(pattern, normalized):
-                    return AccessibilityIssue(
-                        wcag_criterion="1.1.1",
-                        severity=Severity.WARNING,
-                        description=f"Image has non-descriptive alt text: '{alt}'",
-                        suggestion="Use alt text that describes the image content"
-                    )
+        if alt and _UNHELPFUL_ALT_RE.match(alt.lower().strip()):
+            return AccessibilityIssue(
+                wcag_criterion="1.1.1",
+                severity=Severity.WARNING,
+                description=f"Image has non-descriptive alt text: '{alt}'",
+                suggestion="Use alt text that describes the image content"
+            )
 
         return None
 
@@ -306,7 +402,7 @@ class AccessibilityChecker:
         issues = []
 
         for input_id, has_label, input_type in inputs_with_labels:
-            if not has_label and input_type not in ("hidden", "submit", "button", "reset", "image"):
+            if not has_label and input_type not in _UNLABELLED_INPUT_TYPES:
                 issues.append(AccessibilityIssue(
                     wcag_criterion="4.1.2",
                     severity=Severity.ERROR,
@@ -329,32 +425,12 @@ class AccessibilityChecker:
         Returns:
             Tuple of (contrast_ratio, meets_aa_normal_text)
         """
-        def hex_to_rgb(hex_color: str) -> tuple[int, int, int]:
-            hex_color = hex_color.lstrip('#')
-            return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-
-        def relative_luminance(rgb: tuple[int, int, int]) -> float:
-            r, g, b = [x / 255 for x in rgb]
-            r = r / 12.92 if r <= 0.03928 else ((r + 0.055) / 1.055) ** 2.4
-            g = g / 12.92 if g <= 0.03928 else ((g + 0.055) / 1.055) ** 2.4
-            b = b / 12.92 if b <= 0.03928 else ((b + 0.055) / 1.055) ** 2.4
-            return 0.2126 * r + 0.7152 * g + 0.0722 * b
-
         try:
-            fg_rgb = hex_to_rgb(fg_hex)
-            bg_rgb = hex_to_rgb(bg_hex)
-
-            l1 = relative_luminance(fg_rgb)
-            l2 = relative_luminance(bg_rgb)
-
-            lighter = max(l1, l2)
-            darker = min(l1, l2)
-
-            ratio = (lighter + 0.05) / (darker + 0.05)
+            ratio = contrast_ratio(fg_hex, bg_hex)
 
             # WCAG AA requires 4.5:1 for normal text, 3:1 for large text
             return ratio, ratio >= 4.5
-        except (ValueError, IndexError):
+        except ValueError:
             return 0, False
 
     @staticmethod
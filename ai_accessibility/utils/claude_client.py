@@ -1,24 +1,75 @@
 """Claude API client for accessibility-focused operations."""
 
+import io
 import os
 import base64
-from typing import Optional
+import hashlib
+import json
+import re
+from typing import Optional, Tuple
 from dotenv import load_dotenv
-from anthropic import Anthropic
+from anthropic import Anthropic, Timeout
+from PIL import Image
+
+from utils.llm_cache import LLMCache
+
+# Fail fast when the API is unreachable; generation itself can take a while
+_API_TIMEOUT = Timeout(120.0, connect=5.0)
+
+# Rate-limit (429), overload and 5xx responses are retried by the SDK with exponential
+# backoff that honors Retry-After; concurrent image requests make these more likely
+_API_MAX_RETRIES = 5
+
+# Alt text describe_complex_image returns when Claude's response cannot be parsed
+IMAGE_DESCRIPTION_UNAVAILABLE = "Image description unavailable"
+
+# Claude scales larger images down to this long edge anyway, so bigger uploads only add transfer time
+_MAX_IMAGE_EDGE = 1568
+
+
+def _downscale_image(image_data: bytes, media_type: str) -> Tuple[bytes, str]:
+    """Shrink an image whose long edge exceeds _MAX_IMAGE_EDGE; smaller or unreadable images pass through."""
+    try:
+        # Opening only reads the header, so small images cost almost nothing here
+        image = Image.open(io.BytesIO(image_data))
+        if max(image.size) <= _MAX_IMAGE_EDGE:
+            return image_data, media_type
+
+        # Keep transparency as PNG; flattening it to JPEG would turn clear areas black
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        image.thumbnail((_MAX_IMAGE_EDGE, _MAX_IMAGE_EDGE), Image.LANCZOS)
+
+        buffer = io.BytesIO()
+        if has_alpha:
+            image.save(buffer, format="PNG", optimize=True)
+            return buffer.getvalue(), "image/png"
+        image.save(buffer, format="JPEG", quality=85, optimize=True)
+        return buffer.getvalue(), "image/jpeg"
+    except Exception:
+        return image_data, media_type
 
 
 class ClaudeClient:
     """Wrapper for Claude API with accessibility-focused prompts."""
 
-    def __init__(self):
+    def __init__(self, llm_cache: Optional[LLMCache] = None):
         load_dotenv()
         self.api_key = os.getenv("CLAUDE_API_KEY")
         self.model = os.getenv("CLAUDE_MODEL", "claude-sonnet-4-5")
+        # Alt text and image descriptions are narrow tasks that a faster, cheaper model handles well
+        self.vision_model = os.getenv("CLAUDE_VISION_MODEL", "claude-haiku-4-5")
+        # Captions, code-chunk labels, link text and heading checks are short, structured answers;
+        # speed matters more than depth
+        self.fast_model = os.getenv("CLAUDE_FAST_MODEL", "claude-haiku-4-5")
 
         if not self.api_key:
             raise ValueError("CLAUDE_API_KEY not found in environment")
 
-        self.client = Anthropic(api_key=self.api_key)
+        # One client per ClaudeClient; its connection pool is reused by every request
+        self.client = Anthropic(api_key=self.api_key, timeout=_API_TIMEOUT, max_retries=_API_MAX_RETRIES)
+        # Alt text for an image already described in the same context is reused across runs
+        self.llm_cache = llm_cache or LLMCache()
 
     def generate_alt_text(
         self,
@@ -51,10 +102,23 @@ Follow WCAG 2.1 AA guidelines:
 
 Respond with ONLY the alt text, nothing else."""
 
+        cache_key = LLMCache.make_key(
+            model=self.vision_model,
+            kind='alt-text',
+            image=hashlib.sha256(image_data).hexdigest() if image_data else None,
+            media_type=media_type,
+            image_context=image_context,
+            surrounding_text=surrounding_text,
+        )
+        cached = self.llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         messages = []
 
         if image_data:
             # Include the actual image for analysis
+            image_data, media_type = _downscale_image(image_data, media_type)
             encoded_image = base64.standard_b64encode(image_data).decode("utf-8")
             content = [
                 {
@@ -77,13 +141,15 @@ Respond with ONLY the alt text, nothing else."""
         messages.append({"role": "user", "content": content})
 
         response = self.client.messages.create(
-            model=self.model,
+            model=self.vision_model,
             max_tokens=200,
             system=system_prompt,
             messages=messages
         )
 
-        return response.content[0].text.strip()
+        alt_text = response.content[0].text.strip()
+        self.llm_cache.set(cache_key, alt_text)
+        return alt_text
 
     def analyze_heading_structure(self, content: str, format_type: str) -> dict:
         """
@@ -111,7 +177,7 @@ Respond in JSON format:
 }"""
 
         response = self.client.messages.create(
-            model=self.model,
+            model=self.fast_model,
             max_tokens=1000,
             system=system_prompt,
             messages=[{
@@ -120,8 +186,6 @@ Respond in JSON format:
             }]
         )
 
-        import json
-        import re
         try:
             response_text = response.content[0].text
             # Strip markdown code blocks if present
@@ -169,7 +233,7 @@ Respond in JSON format as a list:
         links_text = "\n".join([f"- Text: '{l['text']}' -> URL: {l['href']}" for l in links[:20]])
 
         response = self.client.messages.create(
-            model=self.model,
+            model=self.fast_model,
             max_tokens=1000,
             system=system_prompt,
             messages=[{
@@ -178,8 +242,6 @@ Respond in JSON format as a list:
             }]
         )
 
-        import json
-        import re
         try:
             response_text = response.content[0].text
             # Strip markdown code blocks if present
@@ -190,6 +252,55 @@ Respond in JSON format as a list:
         except json.JSONDecodeError:
             return [{"original": l["text"], "improved": l["text"], "needs_change": False} for l in links]
 
+    def describe_code_chunks(self, chunks: list[dict]) -> list[dict]:
+        """
+        Generate figure/table captions and figure alt text for several code chunks at once.
+
+        Args:
+            chunks: List of dicts with 'id', 'kind' ('fig-cap', 'fig-alt' or 'tbl-cap') and 'code' keys
+
+        Returns:
+            List of dicts with 'id' and 'text' keys
+        """
+        if not chunks:
+            return []
+
+        system_prompt = """You are an accessibility expert writing captions and alt text for the figures and tables that code chunks in a Quarto document produce.
+
+Write one piece of text per chunk, according to its kind:
+- fig-cap: a brief, descriptive figure caption (1 sentence) based on the plotting code
+- fig-alt: alt text for the figure that describes the type of chart and what data it shows
+- tbl-cap: a brief, descriptive table caption (1 sentence) based on the code that creates the table
+
+Do not wrap the text in quotes.
+
+Respond in JSON format as a list with one entry per chunk:
+[{"id": 0, "text": "..."}]"""
+
+        chunks_text = "\n\n".join(
+            f"=== CHUNK id={c['id']} kind={c['kind']} ===\n{c['code'][:500]}" for c in chunks
+        )
+
+        response = self.client.messages.create(
+            model=self.fast_model,
+            max_tokens=150 * len(chunks),
+            system=system_prompt,
+            messages=[{
+                "role": "user",
+                "content": f"Write the text for each of these code chunks:\n\n{chunks_text}"
+            }]
+        )
+
+        try:
+            response_text = response.content[0].text
+            # Strip markdown code blocks if present
+            json_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', response_text)
+            if json_match:
+                response_text = json_match.group(1)
+            return json.loads(response_text)
+        except json.JSONDecodeError:
+            return []
+
     def generate_table_caption(self, table_content: str, context: str = "") -> str:
         """
         Generate a descriptive caption for a table.
@@ -210,7 +321,7 @@ Create a brief, descriptive caption that:
 Respond with ONLY the caption text, nothing else."""
 
         response = self.client.messages.create(
-            model=self.model,
+            model=self.fast_model,
             max_tokens=100,
             system=system_prompt,
             messages=[{
@@ -267,8 +378,6 @@ Respond in JSON format:
             }]
         )
 
-        import json
-        import re
         try:
             response_text = response.content[0].text
             # Strip markdown code blocks if present
@@ -308,10 +417,11 @@ Respond in JSON format:
     "is_complex": true/false
 }"""
 
+        image_data, media_type = _downscale_image(image_data, media_type)
         encoded_image = base64.standard_b64encode(image_data).decode("utf-8")
 
         response = self.client.messages.create(
-            model=self.model,
+            model=self.vision_model,
             max_tokens=1000,
             system=system_prompt,
             messages=[{
@@ -333,8 +443,6 @@ Respond in JSON format:
             }]
         )
 
-        import json
-        import re
         try:
             response_text = response.content[0].text
             # Strip markdown code blocks if present
@@ -344,7 +452,7 @@ Respond in JSON format:
             return json.loads(response_text)
         except json.JSONDecodeError:
             return {
-                "alt_text": "Image description unavailable",
+                "alt_text": IMAGE_DESCRIPTION_UNAVAILABLE,
                 "long_description": "",
                 "is_complex": False
             }
@@ -0,0 +1,71 @@
+"""On-disk cache for Claude responses that depend only on their inputs."""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+# Default location: ai_accessibility/data/llm_cache
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / "data" / "llm_cache"
+
+# Entries older than this are treated as missing
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+class LLMCache:
+    """Content-addressed store of Claude text responses, one JSON file per entry."""
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory for cache files (defaults to LLM_CACHE_DIR or data/llm_cache)
+            ttl_seconds: Maximum age of an entry before it is ignored
+        """
+        self.cache_dir = Path(cache_dir or os.getenv("LLM_CACHE_DIR") or DEFAULT_CACHE_DIR)
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def make_key(**parts) -> str:
+        """Build a cache key from everything that determines the response."""
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        # Shard by the first two hex digits so no directory grows too large
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None if missing, unreadable, or expired."""
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # A file holding valid JSON of another shape is as unreadable as a corrupt one
+        if not isinstance(entry, dict):
+            return None
+        created = entry.get("created", 0)
+        if not isinstance(created, (int, float)) or time.time() - created > self.ttl_seconds:
+            return None
+        return entry.get("value")
+
+    def set(self, key: str, value: str) -> None:
+        """Store a response. Write failures are ignored; the cache is only an optimization."""
+        path = self._path(key)
+        tmp_path = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and rename so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"created": time.time(), "value": value}, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
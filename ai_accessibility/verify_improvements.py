@@ -3,8 +3,16 @@
 Verify the improvements in the accessible PDF.
 """
 
+import os
+
 import fitz  # PyMuPDF
 
+
+def catalog_language(doc):
+    """Return the /Lang entry of the PDF catalog as PyMuPDF reports it, e.g. ('string', 'en-US')."""
+    return doc.xref_get_key(doc.pdf_catalog(), "Lang")
+
+
 def verify_pdf(pdf_path):
     """Verify accessibility improvements in PDF."""
     print(f"Verifying: {pdf_path}")
@@ -24,8 +32,7 @@ def verify_pdf(pdf_path):
     print("\n🌐 LANGUAGE SETTING:")
     print("-" * 80)
     try:
-        catalog = doc.pdf_catalog()
-        lang = doc.xref_get_key(catalog, "Lang")
+        lang = catalog_language(doc)
         print(f"  PDF Catalog /Lang: {lang}")
     except Exception as e:
         print(f"  Could not read language: {e}")
@@ -81,7 +88,6 @@ def verify_pdf(pdf_path):
     print(f"  Has text content: {'Yes' if doc[0].get_text().strip() else 'No'}")
 
     # File size
-    import os
     file_size = os.path.getsize(pdf_path)
     print(f"  File size: {file_size:,} bytes ({file_size / 1024 / 1024:.2f} MB)")
 